@@ -0,0 +1,340 @@
+import argparse
+import json
+import sys
+import time
+import chess
+from src.ai.bot import ChessBot
+from src.ai.evaluation import PIECE_VALUES, evaluate_piece_squares, evaluate_position, taper
+from src.ai.parallel import LazySMP
+from src.ai.search import SearchConfig
+
+# Fixed position set: opening, middlegame and endgame positions
+BENCH_FENS = [
+    chess.STARTING_FEN,
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4",
+    "rnbqkb1r/pp2pppp/3p1n2/8/3NP3/8/PPP2PPP/RNBQKB1R w KQkq - 1 5",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+    "2r3k1/pp3ppp/2n1b3/3p4/3P4/2PB1N2/P4PPP/4R1K1 w - - 0 20",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "4k3/8/8/3P4/8/8/P1P1P3/4K3 w - - 0 1",
+    "6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1",
+]
+
+# Fixed-depth search positions: the set above plus 40 more across all phases.
+# Never edit this list without resetting the stored baselines.
+SEARCH_FENS = BENCH_FENS + [
+    "4rrk1/pp1n3p/3q2pQ/2p1pb2/2PP4/2P3N1/P2B2PP/4RRK1 b - - 7 19",
+    "rq3rk1/ppp2ppp/1bnpb3/3N2B1/3NP3/7P/PPPQ1PP1/2KR3R w - - 7 14",
+    "r1bq1r1k/1pp1n1pp/1p1p4/4p2Q/4Pp2/1BNP4/PPP2PPP/3R1RK1 w - - 2 14",
+    "r3r1k1/2p2ppp/p1p1bn2/8/1q2P3/2NPQN2/PPP3PP/R4RK1 b - - 2 15",
+    "r1bbk1nr/pp3p1p/2n5/1N4p1/2Np1B2/8/PPP2PPP/2KR1B1R w kq - 0 13",
+    "r1bq1rk1/ppp1nppp/4n3/3p3Q/3P4/1BP1B3/PP1N2PP/R4RK1 w - - 1 16",
+    "4r1k1/r1q2ppp/ppp2n2/4P3/5Rb1/1N1BQ3/PPP3PP/R5K1 w - - 1 17",
+    "2rqkb1r/ppp2p2/2npb1p1/1N1Nn2p/2P1PP2/8/PP2B1PP/R1BQK2R b KQ - 0 11",
+    "r1bq1r1k/b1p1npp1/p2p3p/1p6/3PP3/1B2NN2/PP3PPP/R2Q1RK1 w - - 1 16",
+    "3r1rk1/p5pp/bpp1pp2/8/q1PP1P2/b3P3/P2NQRPP/1R2B1K1 b - - 6 22",
+    "r1q2rk1/2p1bppp/2Pp4/p6b/Q1PNp3/4B3/PP1R1PPP/2K4R w - - 2 18",
+    "4k2r/1pb2ppp/1p2p3/1R1p4/3P4/2r1PN2/P4PPP/1R4K1 b - - 3 22",
+    "3q2k1/pb3p1p/4pbp1/2r5/PpN2N2/1P2P2P/5PP1/Q2R2K1 b - - 4 26",
+    "6k1/6p1/6Pp/ppp5/3pn2P/1P3K2/1PP2P2/3N4 b - - 0 1",
+    "3b4/5kp1/1p1p1p1p/pP1PpP1P/P1P1P3/3KN3/8/8 w - - 0 1",
+    "2K5/p7/7P/5pR1/8/5k2/r7/8 w - - 0 1",
+    "8/6pk/1p6/8/PP3p1p/5P2/4KP1q/3Q4 w - - 0 1",
+    "7k/3p2pp/4q3/8/4Q3/5Kp1/P6b/8 w - - 0 1",
+    "8/2p5/8/2kPKp1p/2p4P/2P5/3P4/8 w - - 0 1",
+    "8/1p3pp1/7p/5P1P/2k3P1/8/2K2P2/8 w - - 0 1",
+    "8/pp2r1k1/2p1p3/3pP2p/1P1P1P1P/P5KR/8/8 w - - 0 1",
+    "8/3p4/p1bk3p/Pp6/1Kp1PpPp/2P2P1P/2P5/5B2 b - - 0 1",
+    "5k2/7R/4P2p/5K2/p1r2P1p/8/8/8 b - - 0 1",
+    "6k1/6p1/P6p/r1N5/5p2/7P/1b3PP1/4R1K1 w - - 0 1",
+    "1r3k2/4q3/2Pp3b/3Bp3/2Q2p2/1p1P2P1/1P2KP2/3N4 w - - 0 1",
+    "6k1/4pp1p/3p2p1/P1pPb3/R7/1r2P1PP/3B1P2/6K1 w - - 0 1",
+    "8/3p3B/5p2/5P2/p7/PP5b/k7/6K1 w - - 0 1",
+    "5rk1/q6p/2p3bR/1pPp1rP1/1P1Pp3/P3B1Q1/1K3P2/R7 w - - 93 90",
+    "4rrk1/1p1nq3/p7/2p1P1pp/3P2bp/3Q1Bn1/PPPB4/1K2R1NR w - - 40 21",
+    "r3k2r/3nnpbp/q2pp1p1/p7/Pp1PPPP1/4BNN1/1P5P/R2Q1RK1 w kq - 0 16",
+    "3Qb1k1/1r2ppb1/pN1n2q1/Pp1Pp1Pr/4P2p/4BP2/4B1R1/1R5K b - - 11 40",
+    "4k3/3q1r2/1N2r1b1/3ppN2/2nPP3/1B1R2n1/2R1Q3/3K4 w - - 5 1",
+    "8/8/8/8/5kp1/P7/8/1K1N4 w - - 0 1",
+    "8/8/8/5N2/8/p7/8/2NK3k w - - 0 1",
+    "8/3k4/8/8/8/4B3/4KB2/2B5 w - - 0 1",
+    "8/8/1P6/5pr1/8/4R3/7k/2K5 w - - 0 1",
+    "8/2p4P/8/kr6/6R1/8/8/1K6 w - - 0 1",
+    "8/8/3P3k/8/1p6/8/1P6/1K3n2 b - - 0 1",
+    "8/R7/2q5/8/6k1/8/1P5p/K6R w - - 0 124",
+    "6k1/3b3r/1p1p4/p1n2p2/1PPNpP1q/P3Q1p1/1R1RB1P1/5K2 b - - 0 1",
+]
+
+# Standard perft positions: (fen, depth, expected leaf count)
+PERFT_POSITIONS = [
+    (chess.STARTING_FEN, 4, 197281),
+    ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", 3, 97862),
+    ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", 4, 43238),
+    ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", 3, 9467),
+    ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", 3, 62379),
+    ("r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10", 3, 89890),
+]
+
+# A rate this much below the baseline's fails the comparison
+REGRESSION_THRESHOLD = 0.10
+
+def legacy_evaluate_position(board):
+    """The original square-scanning evaluator, kept as the benchmark baseline"""
+    material_score = 0
+    for square in chess.SQUARES:
+        piece = board.piece_at(square)
+        if piece is not None:
+            piece_value = PIECE_VALUES[piece.piece_type]
+            if piece.color == chess.WHITE:
+                material_score += piece_value
+            else:
+                material_score -= piece_value
+    
+    positional_score = 0
+    for square in [chess.E4, chess.E5, chess.D4, chess.D5]:
+        piece = board.piece_at(square)
+        if piece is not None:
+            if piece.color == chess.WHITE:
+                positional_score += 10
+            else:
+                positional_score -= 10
+    
+    for square, piece_type in ((chess.B1, chess.KNIGHT), (chess.G1, chess.KNIGHT),
+                               (chess.C1, chess.BISHOP), (chess.F1, chess.BISHOP)):
+        if board.piece_at(square) != chess.Piece(piece_type, chess.WHITE):
+            positional_score += 10
+        if board.piece_at(chess.square_mirror(square)) != chess.Piece(piece_type, chess.BLACK):
+            positional_score -= 10
+    
+    return material_score + positional_score
+
+def evals_per_second(evaluate, boards, min_time=1.0):
+    """Evaluate the position set repeatedly for at least min_time seconds"""
+    count = 0
+    start = time.perf_counter()
+    while True:
+        for board in boards:
+            evaluate(board)
+        count += len(boards)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return count / elapsed
+
+def bench_eval(min_time=1.0):
+    """Compare evaluations per second of the legacy and current evaluators"""
+    boards = [chess.Board(fen) for fen in BENCH_FENS]
+    results = {
+        'legacy': evals_per_second(legacy_evaluate_position, boards, min_time),
+        # Same terms as the legacy evaluator, computed from bitboards
+        'bitboard': evals_per_second(lambda board: taper(*evaluate_piece_squares(board)), boards, min_time),
+        'full': evals_per_second(evaluate_position, boards, min_time),
+    }
+    print(f"Evaluation benchmark ({len(boards)} positions)")
+    for name, rate in results.items():
+        print(f"  {name:<8} {rate:>12,.0f} evals/s")
+    print("  full = bitboard terms + pawn structure, mobility and king safety")
+    return results
+
+def bench_smp(worker_counts=(1, 2, 4, 8), time_per_position=2.0, positions=4):
+    """Nodes per second and depth reached by Lazy SMP for each worker count"""
+    boards = [chess.Board(fen) for fen in BENCH_FENS[:positions]]
+    results = {}
+    print(f"Lazy SMP scaling ({len(boards)} positions, {time_per_position:.1f}s each)")
+    for workers in worker_counts:
+        smp = LazySMP(workers)
+        try:
+            # Warm up so process start-up isn't measured
+            smp.search(boards[0], 1)
+            nodes = 0
+            elapsed = 0.0
+            depths = []
+            for board in boards:
+                smp.new_game()
+                result = smp.search(board, 64, time_limit=time_per_position)
+                nodes += result.nodes
+                elapsed += result.elapsed
+                depths.append(result.depth)
+        finally:
+            smp.close()
+        nps = nodes / elapsed if elapsed else 0.0
+        results[workers] = {'nps': nps, 'average_depth': sum(depths) / len(depths)}
+        speedup = nps / results[worker_counts[0]]['nps'] if results[worker_counts[0]]['nps'] else 0.0
+        print(f"  {workers} workers: {nps:>10,.0f} nodes/s  x{speedup:.2f}  "
+              f"avg depth {results[workers]['average_depth']:.1f}")
+    return results
+
+def perft(board, depth):
+    """Number of leaf nodes depth plies below board"""
+    if depth == 1:
+        return board.legal_moves.count()
+    nodes = 0
+    for move in board.legal_moves:
+        board.push(move)
+        nodes += perft(board, depth - 1)
+        board.pop()
+    return nodes
+
+def bench_perft():
+    """Move generation throughput, checked against the known perft counts"""
+    nodes = 0
+    failures = []
+    start = time.perf_counter()
+    print(f"Perft ({len(PERFT_POSITIONS)} positions)")
+    for fen, depth, expected in PERFT_POSITIONS:
+        count = perft(chess.Board(fen), depth)
+        nodes += count
+        if count != expected:
+            failures.append(fen)
+            print(f"  MISMATCH depth {depth}: {count} != {expected}  {fen}")
+    elapsed = time.perf_counter() - start
+    results = {'nodes': nodes, 'time': elapsed, 'nps': nodes / elapsed, 'failures': failures}
+    print(f"  {nodes:,} nodes in {elapsed:.2f}s  {results['nps']:,.0f} nodes/s  "
+          f"{'OK' if not failures else f'{len(failures)} FAILED'}")
+    return results
+
+def bench_search(depth=4, hash_mb=16):
+    """
+    Fixed-depth search over SEARCH_FENS with a cleared TT per position. The
+    total node count is the signature: it only changes when the search or
+    evaluation does something different, never with machine speed.
+    """
+    bot = ChessBot(depth=depth, hash_mb=hash_mb)
+    nodes = 0
+    elapsed = 0.0
+    print(f"Search benchmark ({len(SEARCH_FENS)} positions, depth {depth})")
+    try:
+        for fen in SEARCH_FENS:
+            bot.new_game()
+            start = time.perf_counter()
+            bot.choose_move(chess.Board(fen))
+            elapsed += time.perf_counter() - start
+            nodes += bot.last_search.nodes
+    finally:
+        bot.close()
+    results = {'depth': depth, 'nodes': nodes, 'time': elapsed,
+               'nps': nodes / elapsed if elapsed else 0.0, 'signature': nodes}
+    print(f"  {nodes:,} nodes in {elapsed:.2f}s  {results['nps']:,.0f} nodes/s  signature {nodes}")
+    return results
+
+def bench_root_split(depth=4, workers=2):
+    """
+    Root splitting against the serial search at fixed depth over
+    SEARCH_FENS. With plain alpha-beta (no PVS, null move, LMR or futility
+    pruning) both must report the same score; a different score is a
+    failure. The move may still differ, but only for one of equal score,
+    since root splitting scores its move exactly. With the selective
+    features on, pruning depends on the search window, the TT and the move
+    ordering history, which differ between the two, so only the rate of
+    agreement is reported.
+    """
+    plain = SearchConfig(pvs=False, null_move=False, late_move_reductions=False,
+                         futility_pruning=False)
+    results = {'depth': depth, 'workers': workers}
+    print(f"Root splitting vs serial ({len(SEARCH_FENS)} positions, depth {depth}, {workers} workers)")
+    for name, config in (('plain', plain), ('selective', SearchConfig())):
+        serial = ChessBot(depth=depth, search_config=config)
+        split = ChessBot(depth=depth, workers=workers, parallel='root_split', search_config=config)
+        mismatches = []
+        score_mismatches = []
+        try:
+            for fen in SEARCH_FENS:
+                board = chess.Board(fen)
+                serial.new_game()
+                split.new_game()
+                serial_move = serial.choose_move(board)
+                split_move = split.choose_move(board)
+                if serial.last_search.score != split.last_search.score:
+                    score_mismatches.append(fen)
+                    if name == 'plain':
+                        print(f"  MISMATCH {serial_move} {serial.last_search.score} != "
+                              f"{split_move} {split.last_search.score}  {fen}")
+                if serial_move != split_move or serial.last_search.score != split.last_search.score:
+                    mismatches.append(fen)
+        finally:
+            split.close()
+        agreement = 1 - len(mismatches) / len(SEARCH_FENS)
+        results[name] = {'agreement': agreement, 'mismatches': mismatches,
+                         'score_mismatches': score_mismatches}
+        print(f"  {name:<9} {agreement:.0%} same move and score, "
+              f"{len(SEARCH_FENS) - len(score_mismatches)}/{len(SEARCH_FENS)} same score")
+    results['failures'] = results['plain']['score_mismatches']
+    return results
+
+def compare_to_baseline(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    Compare each rate (perft and search nps, eval evals/s) with the baseline.
+    Returns the list of problems: rates more than threshold slower, a
+    changed search signature, and perft and root splitting mismatches.
+    """
+    problems = []
+    rates = []
+    if results.get('split', {}).get('failures'):
+        problems.append(f"root splitting differs from serial in {len(results['split']['failures'])} positions")
+    if 'perft' in results:
+        if results['perft']['failures']:
+            problems.append(f"perft mismatch in {len(results['perft']['failures'])} positions")
+        rates.append(('perft nps', results['perft']['nps'], baseline.get('perft', {}).get('nps')))
+    if 'search' in results:
+        base_search = baseline.get('search', {})
+        rates.append(('search nps', results['search']['nps'], base_search.get('nps')))
+        if base_search.get('depth') == results['search']['depth'] and \
+                base_search.get('signature') != results['search']['signature']:
+            problems.append(f"search signature {results['search']['signature']} "
+                            f"!= baseline {base_search.get('signature')}")
+    for name, rate in results.get('eval', {}).items():
+        rates.append((f'eval {name}', rate, baseline.get('eval', {}).get(name)))
+    
+    print(f"Against the baseline (fail below -{threshold:.0%})")
+    for name, rate, base_rate in rates:
+        if not base_rate:
+            continue
+        change = rate / base_rate - 1
+        print(f"  {name:<14} {change:+.1%}")
+        if change < -threshold:
+            problems.append(f"{name} {change:+.1%}")
+    return problems
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Chess bot benchmarks")
+    parser.add_argument('suite', nargs='?', default='eval',
+                        choices=['eval', 'smp', 'perft', 'search', 'split', 'all'])
+    parser.add_argument('--time', type=float, default=1.0, help="seconds per measurement")
+    parser.add_argument('--workers', default='1,2,4,8',
+                        help="worker counts for the smp suite; the split suite uses the largest")
+    parser.add_argument('--depth', type=int, default=4, help="depth of the search and split suites")
+    parser.add_argument('--json', help="write the results to this file")
+    parser.add_argument('--baseline', help="results file to compare against; regressions exit with status 1")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="allowed slowdown against the baseline, as a fraction")
+    args = parser.parse_args()
+    
+    results = {}
+    if args.suite == 'smp':
+        results['smp'] = bench_smp(tuple(int(count) for count in args.workers.split(',')), args.time)
+    if args.suite in ('perft', 'all'):
+        results['perft'] = bench_perft()
+    if args.suite in ('search', 'all'):
+        results['search'] = bench_search(args.depth)
+    if args.suite == 'split':
+        results['split'] = bench_root_split(args.depth, max(int(count) for count in args.workers.split(',')))
+    if args.suite in ('eval', 'all'):
+        results['eval'] = bench_eval(args.time)
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    
+    problems = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = compare_to_baseline(results, json.load(f), args.threshold)
+    else:
+        if results.get('perft', {}).get('failures'):
+            problems.append("perft mismatch")
+        if results.get('split', {}).get('failures'):
+            problems.append("root splitting mismatch")
+    if problems:
+        print("FAILED: " + "; ".join(problems))
+        sys.exit(1)
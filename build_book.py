@@ -0,0 +1,21 @@
+import argparse
+import glob
+from src.ai.book import build_book
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build a Polyglot opening book from PGN files")
+    parser.add_argument('pgn', nargs='*', default=glob.glob('src/game/*.pgn'), help="PGN files (default: src/game/*.pgn)")
+    parser.add_argument('--output', default='book.bin')
+    parser.add_argument('--max-ply', type=int, default=20, help="only book moves before this ply")
+    parser.add_argument('--min-rating', type=int, help="skip games where either player is rated lower")
+    parser.add_argument('--result', action='append', choices=['1-0', '0-1', '1/2-1/2'],
+                        help="only use games with this result (repeatable)")
+    parser.add_argument('--color', choices=['white', 'black'], help="only book moves played by this side")
+    parser.add_argument('--min-weight', type=int, default=1)
+    args = parser.parse_args()
+    
+    color = None if args.color is None else args.color == 'white'
+    count = build_book(args.pgn, args.output, max_ply=args.max_ply, min_rating=args.min_rating,
+                       results=set(args.result) if args.result else None, color=color,
+                       min_weight=args.min_weight)
+    print(f"📖 Wrote {count} entries from {len(args.pgn)} PGN files to {args.output}")
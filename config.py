@@ -3,6 +3,22 @@ import os
 class Config:
     LICHESS_TOKEN = os.environ.get('LICHESS_TOKEN')
     BOT_USERNAME = os.environ.get('BOT_USERNAME')
+    # Search on the opponent's time in games with a clock
+    PONDER = os.environ.get('PONDER', 'true').lower() == 'true'
+    # Polyglot opening book (see build_book.py); no book when unset
+    BOOK_PATH = os.environ.get('BOOK_PATH')
+    # Local Syzygy tablebase directory; no tablebases when unset
+    SYZYGY_PATH = os.environ.get('SYZYGY_PATH')
+    # Probe positions with at most this many pieces (default: the largest tables found)
+    SYZYGY_MAX_PIECES = int(os.environ['SYZYGY_MAX_PIECES']) if os.environ.get('SYZYGY_MAX_PIECES') else None
+    # Play through the asyncio client (many games, searches in a process pool)
+    ASYNC_CLIENT = os.environ.get('ASYNC_CLIENT', 'false').lower() == 'true'
+    SEARCH_WORKERS = int(os.environ.get('SEARCH_WORKERS', 2))
+    # Most games played at once; seeking and challenges stop at this number.
+    # One game at a time unless raised, ideally alongside SCHEDULER_WORKERS
+    MAX_GAMES = int(os.environ.get('MAX_GAMES', 1))
+    # Threads running the threaded client's searches, most urgent game first
+    SCHEDULER_WORKERS = int(os.environ.get('SCHEDULER_WORKERS', 1))
     FLASK_HOST = '0.0.0.0'
     FLASK_PORT = int(os.environ.get('PORT', 5000))
     DEBUG = False
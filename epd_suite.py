@@ -0,0 +1,157 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import chess
+from src.ai.bot import ChessBot
+
+# Search worker's bot, created once per process by init_worker
+worker_bot = None
+
+def load_epd(path):
+    """
+    Positions of an EPD file as dicts with id, fen, bm and am (UCI lists).
+    Lines without a bm or am operation can't be scored and are skipped.
+    """
+    positions = []
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                board, ops = chess.Board.from_epd(line)
+            except ValueError as e:
+                print(f"⚠️ {path}:{number}: {e}")
+                continue
+            best = ops.get('bm', [])
+            avoid = ops.get('am', [])
+            if not best and not avoid:
+                continue
+            positions.append({
+                'id': str(ops.get('id', f'{os.path.basename(path)}:{number}')),
+                'fen': board.fen(),
+                'bm': [move.uci() for move in best],
+                'am': [move.uci() for move in avoid],
+            })
+    return positions
+
+def is_solution(move, position):
+    """A move solves a position when it is a best move and not an avoid move"""
+    if position['bm'] and move not in position['bm']:
+        return False
+    return move not in position['am']
+
+def init_worker(hash_mb, syzygy_path):
+    global worker_bot
+    worker_bot = ChessBot(hash_mb=hash_mb, syzygy_path=syzygy_path)
+
+def solve_position(position, time_limit, node_limit):
+    """
+    Worker task: search one position and report the move played and, if
+    it solved the position, the time and nodes of the first iteration from
+    which every later iteration chose a solving move.
+    """
+    worker_bot.new_game()
+    board = chess.Board(position['fen'])
+    move = worker_bot.choose_move(board, time_limit=time_limit, node_limit=node_limit)
+    search = worker_bot.last_search
+    uci = move.uci() if move else None
+    
+    solved_time = solved_nodes = None
+    elapsed = nodes = 0
+    for iteration in search.iterations:
+        elapsed += iteration['time']
+        nodes += iteration['nodes']
+        if not is_solution(iteration['move'], position):
+            solved_time = solved_nodes = None
+        elif solved_time is None:
+            solved_time, solved_nodes = elapsed, nodes
+    solved = uci is not None and is_solution(uci, position)
+    if solved and solved_time is None:
+        # Book or tablebase move, or no iteration completed
+        solved_time, solved_nodes = search.elapsed, search.nodes
+    
+    return {
+        'id': position['id'],
+        'move': uci,
+        'solved': solved,
+        'depth': search.depth,
+        'nodes': search.nodes,
+        'time': search.elapsed,
+        'time_to_solution': solved_time if solved else None,
+        'nodes_to_solution': solved_nodes if solved else None,
+    }
+
+def run_suite(positions, time_limit=1.0, node_limit=None, workers=None, hash_mb=16,
+              syzygy_path=None, verbose=False):
+    """Score positions across a process pool; returns (summary, per-position results)"""
+    workers = workers or os.cpu_count() or 1
+    results = [None] * len(positions)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(hash_mb, syzygy_path)) as pool:
+        futures = {pool.submit(solve_position, position, time_limit, node_limit): index
+                   for index, position in enumerate(positions)}
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            if verbose:
+                mark = '✅' if result['solved'] else '❌'
+                print(f"  {mark} {result['id']:<16} {result['move'] or '-':<6} "
+                      f"depth {result['depth']:>2}  {result['nodes']:>9,} nodes")
+    wall = time.perf_counter() - start
+    
+    solved = [result for result in results if result['solved']]
+    summary = {
+        'positions': len(results),
+        'solved': len(solved),
+        'wall_time': wall,
+        'workers': workers,
+        'time_limit': time_limit,
+        'node_limit': node_limit,
+        'mean_time_to_solution': (sum(result['time_to_solution'] for result in solved) / len(solved)
+                                  if solved else None),
+        'mean_nodes_to_solution': (sum(result['nodes_to_solution'] for result in solved) / len(solved)
+                                   if solved else None),
+        'total_nodes': sum(result['nodes'] for result in results),
+    }
+    return summary, results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Score the bot on EPD test suites (bm/am operations)")
+    parser.add_argument('epd', nargs='+', help="EPD files")
+    parser.add_argument('--time', type=float, default=1.0, help="seconds per position")
+    parser.add_argument('--nodes', type=int, help="node budget per position instead of a time limit")
+    parser.add_argument('--workers', type=int, help="search processes (default: one per core)")
+    parser.add_argument('--hash', type=int, default=16, help="transposition table size per worker (MB)")
+    parser.add_argument('--syzygy', help="Syzygy tablebase directory")
+    parser.add_argument('--json', help="write the summary and per-position results to this file")
+    parser.add_argument('--verbose', action='store_true', help="print every position as it finishes")
+    args = parser.parse_args()
+    
+    report = {}
+    for path in args.epd:
+        positions = load_epd(path)
+        if not positions:
+            print(f"No scorable positions in {path}")
+            continue
+        print(f"📋 {path}: {len(positions)} positions")
+        summary, results = run_suite(positions, time_limit=None if args.nodes else args.time,
+                                     node_limit=args.nodes, workers=args.workers, hash_mb=args.hash,
+                                     syzygy_path=args.syzygy, verbose=args.verbose)
+        rate = summary['solved'] / summary['positions']
+        print(f"  Solved {summary['solved']}/{summary['positions']} ({rate:.0%}) "
+              f"in {summary['wall_time']:.1f}s on {summary['workers']} workers")
+        if summary['solved']:
+            print(f"  Mean time to solution {summary['mean_time_to_solution']:.2f}s, "
+                  f"nodes to solution {summary['mean_nodes_to_solution']:,.0f}")
+        report[path] = {'summary': summary, 'results': results}
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    if not report:
+        sys.exit(1)
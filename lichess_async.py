@@ -0,0 +1,212 @@
+import asyncio
+import multiprocessing
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import aiohttp
+import chess
+from config import Config
+from lichess_bot import update_board
+from src.ai.bot import ChessBot
+from src.metrics import METRICS, search_sample
+from src.net.async_http import AsyncLichessHTTP
+from src.net.http_client import LatencyHistogram
+
+BASE_URL = 'https://lichess.org/api'
+
+# Seek time controls (minutes, increment), tried in order
+SEEK_TIME_CONTROLS = [(10, 0), (5, 0), (3, 0), (15, 10), (10, 5)]
+
+# A search worker keeps the ChessBot (TT, killers, book) of this many recent
+# games; older ones are dropped, so worker memory stays bounded
+WORKER_GAMES = 16
+GAME_HASH_MB = 8
+
+worker_bots = OrderedDict()
+
+def game_bot(game_id):
+    """This worker's ChessBot for a game, created on first use"""
+    bot = worker_bots.pop(game_id, None)
+    if bot is None:
+        bot = ChessBot(depth=3, hash_mb=GAME_HASH_MB, book_path=Config.BOOK_PATH,
+                       syzygy_path=Config.SYZYGY_PATH, syzygy_max_pieces=Config.SYZYGY_MAX_PIECES)
+    worker_bots[game_id] = bot
+    while len(worker_bots) > WORKER_GAMES:
+        _, old_bot = worker_bots.popitem(last=False)
+        old_bot.close()
+    return bot
+
+def search_game_move(game_id, moves, color, clock):
+    """
+    Worker task: choose our move in one game. moves is the game's move list
+    (UCI), clock (time_left, increment) in seconds or None.
+    Returns (uci or None, search_sample of the search) so the parent
+    process can count it in its metrics.
+    """
+    bot = game_bot(game_id)
+    bot.set_color(color)
+    board = update_board(chess.Board(), moves)
+    if clock is not None:
+        move = bot.choose_move_with_clock(board, *clock)
+    else:
+        move = bot.choose_move(board)
+    return move.uci() if move else None, search_sample(bot.last_search)
+
+class AsyncLichessBot:
+    """
+    Lichess bot on asyncio: one event stream and one game stream per game
+    share a single HTTP session, and searches run in a process pool. Each
+    game keeps its own board, color and clock here, and its own ChessBot in
+    the search workers, so games never see each other's state.
+    """
+
+    def __init__(self, token, username, workers=2, max_games=10, seek=True):
+        self.http = AsyncLichessHTTP(token)
+        self.username = (username or '').lower()
+        self.workers = workers
+        self.max_games = max_games
+        self.seek = seek
+        self.pool = None
+        self.active_games = {}
+        self.search_latency = LatencyHistogram()
+
+    async def run(self):
+        """Stream events until cancelled"""
+        self.pool = ProcessPoolExecutor(max_workers=self.workers,
+                                        mp_context=multiprocessing.get_context('spawn'))
+        tasks = []
+        try:
+            async with self.http:
+                if self.seek:
+                    tasks.append(asyncio.create_task(self.seek_loop()))
+                await self.stream_events()
+        finally:
+            for task in tasks:
+                task.cancel()
+            for game in list(self.active_games.values()):
+                game['task'].cancel()
+            self.pool.shutdown(cancel_futures=True)
+
+    async def stream_events(self):
+        url = f"{BASE_URL}/stream/event"
+        print(f"📡 Connecting to: {url}")
+        METRICS.inc('lichess_stream_connects_total', stream='event')
+        async for event in self.http.stream('event_stream', url):
+            event_type = event.get('type')
+            if event_type == 'challenge':
+                challenge_id = event.get('challenge', {}).get('id')
+                if challenge_id and len(self.active_games) < self.max_games:
+                    print(f"🎯 Accepting challenge: {challenge_id}")
+                    await self.http.post('accept_challenge', f"{BASE_URL}/challenge/{challenge_id}/accept")
+            elif event_type == 'gameStart':
+                self.start_game(event.get('game', {}).get('id'))
+            elif event_type == 'gameFinish':
+                game_id = event.get('game', {}).get('id')
+                game = self.active_games.pop(game_id, None)
+                if game is not None:
+                    game['task'].cancel()
+                print(f"🏁 Game finished: {game_id}")
+
+    async def seek_loop(self, interval=30):
+        """Keep a seek open whenever there is room for another game"""
+        while True:
+            if len(self.active_games) >= self.max_games:
+                await asyncio.sleep(interval)
+                continue
+            for minutes, increment in SEEK_TIME_CONTROLS:
+                data = {'time': minutes, 'increment': increment, 'rated': 'true', 'variant': 'standard'}
+                try:
+                    # The seek stays open until someone accepts it
+                    status, _ = await self.http.post('seek', f"{BASE_URL}/board/seek", data=data,
+                                                     timeout=aiohttp.ClientTimeout(total=None, sock_read=None))
+                except aiohttp.ClientError as e:
+                    print(f"Error while seeking: {e}")
+                    status = None
+                if status == 200:
+                    print(f"Seek {minutes}+{increment} accepted")
+                    break
+            await asyncio.sleep(interval if self.active_games else 10)
+
+    def start_game(self, game_id):
+        if not game_id or game_id in self.active_games:
+            return
+        print(f"🎮 Game started: {game_id}")
+        self.active_games[game_id] = {
+            'board': chess.Board(),
+            'bot_color': None,
+            'clock': None,
+        }
+        self.active_games[game_id]['task'] = asyncio.create_task(self.play_game(game_id))
+
+    async def play_game(self, game_id):
+        url = f"{BASE_URL}/bot/game/stream/{game_id}"
+        METRICS.inc('lichess_stream_connects_total', stream='game')
+        try:
+            async for event in self.http.stream('game_stream', url):
+                game = self.active_games.get(game_id)
+                if game is None:
+                    break
+                event_type = event.get('type')
+                if event_type == 'gameFull':
+                    white = event.get('white', {}).get('id', '').lower()
+                    game['bot_color'] = chess.WHITE if white == self.username else chess.BLACK
+                    state = event.get('state', {})
+                elif event_type == 'gameState':
+                    state = event
+                else:
+                    continue
+                
+                game['board'] = update_board(game['board'], state.get('moves', ''))
+                if 'wtime' in state and 'btime' in state:
+                    game['clock'] = state
+                if state.get('status', 'started') != 'started':
+                    break
+                await self.maybe_move(game_id, game)
+        except aiohttp.ClientError as e:
+            print(f"❌ Game stream error {game_id}: {e}")
+            METRICS.inc('lichess_stream_drops_total', stream='game')
+        finally:
+            self.active_games.pop(game_id, None)
+
+    async def maybe_move(self, game_id, game):
+        board = game['board']
+        color = game['bot_color']
+        if board.turn != color or board.is_game_over():
+            return
+        
+        clock = None
+        deadline = None
+        if game['clock'] is not None:
+            side = 'w' if color == chess.WHITE else 'b'
+            clock = (game['clock'][f'{side}time'] / 1000, game['clock'].get(f'{side}inc', 0) / 1000)
+            deadline = time.monotonic() + clock[0]
+        moves = ' '.join(move.uci() for move in board.move_stack)
+        
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        move_uci, sample = await loop.run_in_executor(
+            self.pool, search_game_move, game_id, moves, color, clock)
+        self.search_latency.observe(time.perf_counter() - start)
+        METRICS.record_search(sample)
+        
+        # The game may have moved on (takeback, abort) while we were thinking
+        if move_uci is None or game['board'] is not board or len(board.move_stack) != len(moves.split()):
+            return
+        board.push_uci(move_uci)
+        try:
+            status, body = await self.http.post('move', f"{BASE_URL}/bot/game/{game_id}/move/{move_uci}",
+                                                deadline=deadline)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # The move may still have arrived; the game stream will tell
+            print(f"❌ Move failed: {e}")
+            return
+        if status == 200:
+            print(f"✅ Move sent: {move_uci} ({game_id}, depth {sample['depth']}, {sample['nodes']} nodes)")
+        else:
+            print(f"❌ Move failed: {status} - {body}")
+
+    def latency_stats(self):
+        """Latency histograms: move search time and each API endpoint's round trip"""
+        stats = {'search': self.search_latency.snapshot()}
+        stats.update(self.http.latency_stats())
+        return stats
@@ -1,34 +1,74 @@
-import requests
 import json
 import time
 import chess
+import requests
+from config import Config
 from src.ai.bot import ChessBot
+from src.metrics import METRICS
+from src.net.http_client import STREAM_TIMEOUT, LatencyHistogram, LichessHTTP
+from src.net.scheduler import NO_CLOCK, SearchScheduler, clock_urgency
+
+def update_board(board, moves_string):
+    """
+    Apply a Lichess moves string (all moves of the game) to board. Only the
+    moves not yet on the board's move stack are pushed, so the stack stays
+    intact for repetition detection; a new board is built from scratch only
+    when the known moves no longer match (e.g. a takeback). Returns the
+    board holding the result.
+    """
+    moves = moves_string.split()
+    applied = len(board.move_stack)
+    
+    # Our own moves are pushed locally before the server echoes them, so
+    # the stack is a prefix of the moves unless something was taken back.
+    # Comparing strings is cheap next to replaying the game on a new board
+    if moves[:applied] != [move.uci() for move in board.move_stack]:
+        board = chess.Board()
+        applied = 0
+    
+    for move_uci in moves[applied:]:
+        try:
+            board.push_uci(move_uci)
+        except ValueError:
+            print(f"❌ Invalid move: {move_uci}")
+            break
+    return board
 
 class LichessBotManager:
     def __init__(self, token):
         self.token = token
         self.headers = {'Authorization': f'Bearer {token}'}
+        # One keep-alive session for every API call, with retries and latency histograms
+        self.http = LichessHTTP(token)
+        # Time spent choosing moves, to compare with the move submit round trip
+        self.search_latency = LatencyHistogram()
         self.base_url = 'https://lichess.org/api'
         self.seeking = False
         self.active_games = {}
-        self.bot = ChessBot(depth=4)
+        # Searches of all games share these workers, most urgent clock first
+        self.scheduler = SearchScheduler(Config.SCHEDULER_WORKERS, Config.MAX_GAMES)
+
+    def create_bot(self):
+        """A fresh ChessBot for one game; games never share search state or color"""
+        return ChessBot(depth=3, book_path=Config.BOOK_PATH, syzygy_path=Config.SYZYGY_PATH,
+                        syzygy_max_pieces=Config.SYZYGY_MAX_PIECES)
 
     def upgrade_to_bot(self):
         """Upgrade account to bot account"""
         url = f"{self.base_url}/bot/account/upgrade"
-        response = requests.post(url, headers=self.headers)
+        response = self.http.post('upgrade', url)
         return response.status_code == 200
 
     def get_account_info(self):
         """Get bot account information"""
         url = f"{self.base_url}/account"
-        response = requests.get(url, headers=self.headers)
+        response = self.http.get('account', url)
         return response.json() if response.status_code == 200 else None
 
     def get_current_rating(self, username):
         """Get current ELO ratings for all time controls"""
         url = f"{self.base_url}/user/{username}"
-        response = requests.get(url, headers=self.headers)
+        response = self.http.get('user', url)
         if response.status_code == 200:
             data = response.json()
             perfs = data.get('perfs', {})
@@ -52,7 +92,8 @@ class LichessBotManager:
             'rated': rated,
             'variant': 'standard'
         }
-        response = requests.post(url, headers=self.headers, data=data)
+        # The seek stays active while the request is open, so there is no read timeout
+        response = self.http.post('seek', url, data=data, timeout=STREAM_TIMEOUT)
         return response.status_code == 200
 
     def seek_game_flexible(self):
@@ -74,6 +115,12 @@ class LichessBotManager:
         
         while self.seeking:
             try:
+                if not self.has_capacity():
+                    # Seeking resumes when a game finishes
+                    print("⏸️ Playing the maximum number of games, not seeking")
+                    self.seeking = False
+                    break
+                
                 attempt += 1
                 print(f"Seeking attempt #{attempt}...")
                 
@@ -89,6 +136,10 @@ class LichessBotManager:
                 print(f"Error in seeking loop: {e}")
                 time.sleep(10)
 
+    def has_capacity(self):
+        """Whether another game may be started"""
+        return self.scheduler.has_capacity(len(self.active_games))
+
     def stop_seeking(self):
         """Stop seeking games"""
         self.seeking = False
@@ -96,13 +147,18 @@ class LichessBotManager:
     def accept_challenge(self, challenge_id):
         """Accept a challenge"""
         url = f"{self.base_url}/challenge/{challenge_id}/accept"
-        response = requests.post(url, headers=self.headers)
+        response = self.http.post('accept_challenge', url)
         return response.status_code == 200
 
-    def make_move(self, game_id, move_uci):
-        """Make a move in the game"""
+    def make_move(self, game_id, move_uci, deadline=None):
+        """Make a move in the game; deadline (time.monotonic()) is when our clock runs out"""
         url = f"{self.base_url}/bot/game/{game_id}/move/{move_uci}"
-        response = requests.post(url, headers=self.headers)
+        try:
+            response = self.http.post('move', url, deadline=deadline)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            # The move may still have arrived; the game stream will tell
+            print(f"❌ Move failed: {e}")
+            return False
         
         if response.status_code == 200:
             print(f"✅ Move sent: {move_uci}")
@@ -119,15 +175,20 @@ class LichessBotManager:
         
         print(f"🎮 Game started: {game_id}")
         
-        # Stop seeking when game starts
-        self.seeking = False
-        
         # Initialize game state
         self.active_games[game_id] = {
             'board': chess.Board(),
-            'bot_color': None
+            'bot_color': None,
+            'clock': None,
+            'bot': self.create_bot(),
+            # Replies predicted while pondering, and how many the opponent played
+            'ponder': {'predicted': 0, 'hits': 0}
         }
         
+        # Stop seeking once we play as many games as we have capacity for
+        if not self.has_capacity():
+            self.seeking = False
+        
         # Start game monitoring
         import threading
         game_thread = threading.Thread(target=self.monitor_game, args=(game_id,))
@@ -138,6 +199,8 @@ class LichessBotManager:
         """Handle when a game finishes"""
         game_id = game_data.get('game', {}).get('id')
         if game_id in self.active_games:
+            self.active_games[game_id]['bot'].close()
+            self.report_ponder_stats(game_id)
             del self.active_games[game_id]
         
         print(f"🏁 Game finished: {game_id}")
@@ -146,7 +209,7 @@ class LichessBotManager:
         import threading
         def resume_seeking():
             time.sleep(5)
-            if not self.active_games:  # Only resume if no active games
+            if self.has_capacity() and not self.seeking:
                 callback_url = "http://localhost:5000"
                 threading.Thread(target=self.start_seeking_loop, args=(callback_url,), daemon=True).start()
         
@@ -157,12 +220,13 @@ class LichessBotManager:
         url = f"{self.base_url}/bot/game/stream/{game_id}"
         
         try:
-            with requests.get(url, headers=self.headers, stream=True) as response:
+            with self.http.get('game_stream', url, stream=True) as response:
                 if response.status_code != 200:
                     print(f"❌ Failed to connect to game stream: {response.status_code}")
                     return
                 
                 print(f"📡 Connected to game stream: {game_id}")
+                METRICS.inc('lichess_stream_connects_total', stream='game')
                 
                 for line in response.iter_lines():
                     if line:
@@ -174,6 +238,12 @@ class LichessBotManager:
                             
         except Exception as e:
             print(f"❌ Game monitoring error: {e}")
+            METRICS.inc('lichess_stream_drops_total', stream='game')
+        finally:
+            # The stream is gone, so nobody would ever use or cancel the ponder search
+            game = self.active_games.get(game_id)
+            if game:
+                game['bot'].stop_pondering()
 
     def handle_game_event(self, game_id, event):
         """Handle game events"""
@@ -193,7 +263,6 @@ class LichessBotManager:
         white_player = game_data.get('white', {}).get('id', '')
         black_player = game_data.get('black', {}).get('id', '')
         
-        from config import Config
         bot_username = Config.BOT_USERNAME
         
         if white_player == bot_username:
@@ -205,11 +274,13 @@ class LichessBotManager:
         
         # Set bot color
         self.active_games[game_id]['bot_color'] = bot_color
-        self.bot.set_color(bot_color)
+        self.active_games[game_id]['bot'].set_color(bot_color)
         
         # Process initial moves
-        moves = game_data.get('state', {}).get('moves', '')
+        state = game_data.get('state', {})
+        moves = state.get('moves', '')
         self.process_moves(game_id, moves)
+        self.update_clock(game_id, state)
         
         # Make move if it's bot's turn
         self.check_and_make_move(game_id)
@@ -221,31 +292,37 @@ class LichessBotManager:
         
         moves = game_state.get('moves', '')
         self.process_moves(game_id, moves)
+        self.update_clock(game_id, game_state)
         
         # Check if game is still active
         status = game_state.get('status', 'started')
         if status == 'started':
             self.check_and_make_move(game_id)
+        else:
+            self.active_games[game_id]['bot'].stop_pondering()
+
+    def update_clock(self, game_id, game_state):
+        """Remember the clock fields (milliseconds) sent with the game state"""
+        if 'wtime' not in game_state or 'btime' not in game_state:
+            return
+        
+        self.active_games[game_id]['clock'] = {
+            'wtime': game_state.get('wtime', 0),
+            'btime': game_state.get('btime', 0),
+            'winc': game_state.get('winc', 0),
+            'binc': game_state.get('binc', 0)
+        }
 
     def process_moves(self, game_id, moves_string):
-        """Process moves string and update board"""
+        """Bring the game's board up to date with the moves string"""
         if game_id not in self.active_games:
             return
         
-        # Reset board and replay all moves
-        board = chess.Board()
-        
-        if moves_string:
-            moves = moves_string.split()
-            for move_uci in moves:
-                try:
-                    move = chess.Move.from_uci(move_uci)
-                    if move in board.legal_moves:
-                        board.push(move)
-                except:
-                    print(f"❌ Invalid move: {move_uci}")
-        
-        self.active_games[game_id]['board'] = board
+        board = self.active_games[game_id]['board']
+        updated = update_board(board, moves_string)
+        if updated is not board:
+            print(f"↩️ Move list diverged in {game_id}, rebuilt board")
+        self.active_games[game_id]['board'] = updated
 
     def check_and_make_move(self, game_id):
         """Check if it's bot's turn and make a move"""
@@ -255,13 +332,32 @@ class LichessBotManager:
         game_state = self.active_games[game_id]
         board = game_state['board']
         bot_color = game_state['bot_color']
+        bot = game_state['bot']
         
         # Check if it's bot's turn and game is not over
         if board.turn == bot_color and not board.is_game_over():
             print(f"🎯 Bot's turn! Current position: {board.fen()}")
             
-            # Get best move from bot
-            best_move = self.bot.choose_move(board)
+            # Get best move from bot, budgeted from our remaining clock
+            clock = game_state.get('clock')
+            search_start = time.perf_counter()
+            deadline = None
+            if bot.is_ponder_hit(board):
+                game_state['ponder']['hits'] += 1
+            if clock:
+                if bot_color == chess.WHITE:
+                    time_left, increment = clock['wtime'] / 1000, clock['winc'] / 1000
+                else:
+                    time_left, increment = clock['btime'] / 1000, clock['binc'] / 1000
+                deadline = time.monotonic() + time_left
+                urgency = clock_urgency(time_left, increment, bot.time_manager.moves_to_go(board))
+                # Time spent queued behind other games comes off our clock
+                search = lambda waited: bot.choose_move_with_clock(board, max(0.0, time_left - waited), increment)
+            else:
+                urgency = NO_CLOCK
+                search = lambda waited: bot.choose_move(board)
+            best_move = self.scheduler.submit(game_id, urgency, search).result()
+            self.search_latency.observe(time.perf_counter() - search_start)
             
             if best_move:
                 move_uci = best_move.uci()
@@ -271,9 +367,33 @@ class LichessBotManager:
                 board.push(best_move)
                 
                 # Send move to Lichess
-                self.make_move(game_id, move_uci)
+                self.make_move(game_id, move_uci, deadline)
+                
+                # Think on the opponent's time about their expected reply; with
+                # several games the CPU belongs to the scheduled searches
+                if clock and Config.PONDER and len(self.active_games) == 1 and bot.start_pondering(board):
+                    game_state['ponder']['predicted'] += 1
             else:
                 print("❌ No valid move found!")
+    
+    def report_ponder_stats(self, game_id):
+        """Print how often the opponent played the reply we pondered on"""
+        ponder = self.active_games[game_id]['ponder']
+        if ponder['predicted']:
+            rate = ponder['hits'] / ponder['predicted']
+            print(f"🔮 Ponder hits {game_id}: {ponder['hits']}/{ponder['predicted']} ({rate:.0%})")
+
+    def scheduler_stats(self):
+        """Search queue depth, wait times and capacity"""
+        stats = self.scheduler.stats()
+        stats['active_games'] = len(self.active_games)
+        return stats
+
+    def latency_stats(self):
+        """Latency histograms: move search time and each API endpoint's round trip"""
+        stats = {'search': self.search_latency.snapshot()}
+        stats.update(self.http.latency_stats())
+        return stats
 
     def stream_events(self, callback_url):
         """Stream events from Lichess"""
@@ -281,7 +401,7 @@ class LichessBotManager:
         print(f"📡 Connecting to: {url}")
         
         try:
-            response = requests.get(url, headers=self.headers, stream=True)
+            response = self.http.get('event_stream', url, stream=True)
             print(f"Response status: {response.status_code}")
             
             if response.status_code != 200:
@@ -289,6 +409,7 @@ class LichessBotManager:
                 return
             
             print("✅ Successfully connected to event stream...")
+            METRICS.inc('lichess_stream_connects_total', stream='event')
             
             for line in response.iter_lines():
                 if line:
@@ -300,6 +421,7 @@ class LichessBotManager:
                         
         except Exception as e:
             print(f"❌ Stream error: {e}")
+            METRICS.inc('lichess_stream_drops_total', stream='event')
 
     def handle_event(self, event, callback_url):
         """Handle incoming events"""
@@ -307,9 +429,11 @@ class LichessBotManager:
         
         if event_type == 'challenge':
             challenge_id = event.get('challenge', {}).get('id')
-            if challenge_id:
+            if challenge_id and self.has_capacity():
                 print(f"🎯 Accepting challenge: {challenge_id}")
                 self.accept_challenge(challenge_id)
+            elif challenge_id:
+                print(f"⏸️ Playing the maximum number of games, ignoring challenge {challenge_id}")
                 
         elif event_type == 'gameStart':
             self.handle_game_start(event)
@@ -1,8 +1,9 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 import chess
 from src.ai.bot import ChessBot
 from lichess_bot import LichessBotManager
 from config import Config
+from src.metrics import METRICS
 
 app = Flask(__name__)
 
@@ -39,5 +40,10 @@ def get_status():
         "ratings": current_ratings
     })
 
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Search and Lichess client metrics in the Prometheus text format"""
+    return Response(METRICS.render(bot_manager), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
@@ -1,3 +1,4 @@
+import asyncio
 import threading
 import time
 import requests
@@ -5,11 +6,8 @@ from main import app
 from lichess_bot import LichessBotManager
 from config import Config
 import main
-from flask import Flask
 import os
 
-app = Flask(__name__)
-
 def test_connection():
     """Test Lichess API connection"""
     headers = {'Authorization': f'Bearer {Config.LICHESS_TOKEN}'}
@@ -32,8 +30,22 @@ def start_flask_app():
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port, debug=False, use_reloader=False)
 
+def start_async_bot_system():
+    """Start the asyncio client, which seeks and plays games itself"""
+    # Only the async client needs aiohttp
+    from lichess_async import AsyncLichessBot
+    bot = AsyncLichessBot(Config.LICHESS_TOKEN, Config.BOT_USERNAME,
+                          workers=Config.SEARCH_WORKERS, max_games=Config.MAX_GAMES)
+    main.bot_manager = bot
+    print("📡 Starting asyncio event streaming...")
+    asyncio.run(bot.run())
+
 def start_bot_system():
     """Start the complete bot system"""
+    if Config.ASYNC_CLIENT:
+        start_async_bot_system()
+        return
+    
     bot_manager = LichessBotManager(Config.LICHESS_TOKEN)
     main.bot_manager = bot_manager
     
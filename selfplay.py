@@ -0,0 +1,325 @@
+import argparse
+import math
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import chess
+import chess.pgn
+from src.ai.bot import ChessBot
+from src.ai.search import SearchConfig
+from src.ai.tablebase import Tablebase
+
+# Short, balanced openings (UCI) used when no opening file is given
+DEFAULT_OPENINGS = [
+    "e2e4 e7e5 g1f3 b8c6",
+    "e2e4 c7c5 g1f3 d7d6",
+    "e2e4 e7e6 d2d4 d7d5",
+    "e2e4 c7c6 d2d4 d7d5",
+    "d2d4 d7d5 c2c4 e7e6",
+    "d2d4 g8f6 c2c4 g7g6",
+    "d2d4 g8f6 c2c4 e7e6 g1f3 b7b6",
+    "c2c4 e7e5 b1c3 g8f6",
+    "g1f3 d7d5 g2g3 g8f6",
+    "e2e4 e7e5 f1c4 g8f6",
+]
+
+# ChessBot arguments an engine spec may set; everything else goes to SearchConfig
+BOT_OPTIONS = ('hash_mb',)
+
+def parse_value(text):
+    if text.lower() in ('true', 'false'):
+        return text.lower() == 'true'
+    for kind in (int, float):
+        try:
+            return kind(text)
+        except ValueError:
+            pass
+    return text
+
+def parse_engine(spec):
+    """
+    'null_move=false,hash_mb=32' -> dict of options. Keys are ChessBot's
+    hash_mb or any SearchConfig field.
+    """
+    options = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        key, _, value = item.partition('=')
+        if key not in BOT_OPTIONS and not hasattr(SearchConfig(), key):
+            raise ValueError(f"unknown engine option {key!r}")
+        options[key] = parse_value(value)
+    return options
+
+def make_bot(options):
+    bot_options = {key: value for key, value in options.items() if key in BOT_OPTIONS}
+    config = SearchConfig(**{key: value for key, value in options.items() if key not in BOT_OPTIONS})
+    return ChessBot(search_config=config, **bot_options)
+
+def load_openings(path=None, plies=8):
+    """
+    Openings as (fen, [uci moves]): one FEN or EPD per line, or the first
+    plies moves of every game of a PGN file. Defaults to DEFAULT_OPENINGS.
+    """
+    if path is None:
+        return [(chess.STARTING_FEN, line.split()) for line in DEFAULT_OPENINGS]
+    openings = []
+    if path.endswith('.pgn'):
+        with open(path, encoding='utf-8', errors='replace') as f:
+            while True:
+                game = chess.pgn.read_game(f)
+                if game is None:
+                    break
+                moves = [move.uci() for move in list(game.mainline_moves())[:plies]]
+                if len(moves) == plies:
+                    openings.append((game.board().fen(), moves))
+        return openings
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                board = chess.Board(line)
+            except ValueError:
+                board, _ = chess.Board.from_epd(line)
+            openings.append((board.fen(), []))
+    return openings
+
+class Adjudication:
+    """Rules for ending games early; scores are centipawns from the mover's view"""
+    
+    def __init__(self, resign_score=800, resign_moves=4, draw_score=10, draw_moves=8,
+                 draw_after_move=40, max_moves=200, syzygy_path=None):
+        self.resign_score = resign_score
+        self.resign_moves = resign_moves
+        self.draw_score = draw_score
+        self.draw_moves = draw_moves
+        self.draw_after_move = draw_after_move
+        self.max_moves = max_moves
+        self.syzygy_path = syzygy_path
+
+def play_game(index, opening, a_is_white, engine_a, engine_b, base_time, increment, adjudication):
+    """
+    Worker task: play one game with emulated clocks. Returns a dict with the
+    result from engine A's view (1, 0.5 or 0), the PGN text and how it ended.
+    """
+    fen, moves = opening
+    board = chess.Board(fen)
+    for uci in moves:
+        board.push_uci(uci)
+    bots = {chess.WHITE: make_bot(engine_a if a_is_white else engine_b),
+            chess.BLACK: make_bot(engine_b if a_is_white else engine_a)}
+    for color, bot in bots.items():
+        bot.set_color(color)
+    tablebase = Tablebase(adjudication.syzygy_path) if adjudication.syzygy_path else None
+    clocks = {chess.WHITE: base_time, chess.BLACK: base_time}
+    losing = {chess.WHITE: 0, chess.BLACK: 0}
+    drawish = 0
+    result = termination = None
+    
+    try:
+        while result is None:
+            outcome = board.outcome(claim_draw=True)
+            if outcome is not None:
+                result, termination = outcome.result(), outcome.termination.name.lower()
+                break
+            if tablebase is not None and tablebase.can_probe(board):
+                wdl = tablebase.probe_wdl(board)
+                if wdl is not None:
+                    if abs(wdl) < 2:
+                        result = '1/2-1/2'
+                    else:
+                        result = '1-0' if (wdl > 0) == (board.turn == chess.WHITE) else '0-1'
+                    termination = 'tablebase'
+                    break
+            if board.fullmove_number > adjudication.max_moves:
+                result, termination = '1/2-1/2', 'max_moves'
+                break
+            
+            mover = board.turn
+            start = time.perf_counter()
+            move = bots[mover].choose_move_with_clock(board, clocks[mover], increment)
+            clocks[mover] -= time.perf_counter() - start
+            if clocks[mover] < 0:
+                result, termination = ('0-1' if mover == chess.WHITE else '1-0'), 'time_forfeit'
+                break
+            clocks[mover] += increment
+            
+            search = bots[mover].last_search
+            score = search.score if mover == chess.WHITE else -search.score
+            board.push(move)
+            
+            # Resign after resign_moves moves of a hopeless score
+            losing[mover] = losing[mover] + 1 if score <= -adjudication.resign_score else 0
+            if losing[mover] >= adjudication.resign_moves:
+                result, termination = ('0-1' if mover == chess.WHITE else '1-0'), 'resign'
+            # Draw when both sides see a dead-level score for draw_moves moves each
+            if board.fullmove_number > adjudication.draw_after_move and abs(score) <= adjudication.draw_score:
+                drawish += 1
+            else:
+                drawish = 0
+            if result is None and drawish >= 2 * adjudication.draw_moves:
+                result, termination = '1/2-1/2', 'adjudicated_draw'
+    finally:
+        for bot in bots.values():
+            bot.close()
+        if tablebase is not None:
+            tablebase.close()
+    
+    game = chess.pgn.Game.from_board(board)
+    game.headers['Event'] = 'Self-play'
+    game.headers['Round'] = str(index + 1)
+    game.headers['White'] = 'A' if a_is_white else 'B'
+    game.headers['Black'] = 'B' if a_is_white else 'A'
+    game.headers['Result'] = result
+    game.headers['Termination'] = termination
+    game.headers['TimeControl'] = f'{base_time:g}+{increment:g}'
+    points = {'1-0': 1.0, '0-1': 0.0, '1/2-1/2': 0.5}[result]
+    return {
+        'index': index,
+        'score': points if a_is_white else 1.0 - points,
+        'termination': termination,
+        'pgn': str(game),
+    }
+
+def elo(score):
+    """Elo difference for an expected score in (0, 1)"""
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+def elo_interval(wins, draws, losses, z=1.96):
+    """(Elo, error) of engine A, the error being the 95% half-width by default"""
+    games = wins + draws + losses
+    if games == 0:
+        return 0.0, 0.0
+    score = (wins + draws / 2) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    margin = z * math.sqrt(variance / games)
+    return elo(score), (elo(score + margin) - elo(score - margin)) / 2
+
+def sprt_llr(wins, draws, losses, elo0, elo1):
+    """Log-likelihood ratio of H1 (elo1) against H0 (elo0), normal approximation"""
+    games = wins + draws + losses
+    if games == 0 or wins + losses == 0:
+        return 0.0
+    score = (wins + draws / 2) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    if variance == 0:
+        return 0.0
+    score0 = 1 / (1 + 10 ** (-elo0 / 400))
+    score1 = 1 / (1 + 10 ** (-elo1 / 400))
+    return games * (score1 - score0) * (2 * score - score0 - score1) / (2 * variance)
+
+def sprt_bounds(alpha, beta):
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+def run_match(engine_a, engine_b, openings, games=200, base_time=10.0, increment=0.1, workers=None,
+              adjudication=None, elo0=0.0, elo1=5.0, alpha=0.05, beta=0.05, pgn_path=None):
+    """
+    Play up to games games, each opening twice with colors reversed, and
+    stop early once the SPRT accepts either hypothesis. Returns a summary.
+    """
+    adjudication = adjudication or Adjudication()
+    workers = workers or os.cpu_count() or 1
+    lower, upper = sprt_bounds(alpha, beta)
+    wins = draws = losses = 0
+    llr = 0.0
+    verdict = None
+    terminations = {}
+    pgn_file = open(pgn_path, 'a') if pgn_path else None
+    
+    tasks = ((index, openings[(index // 2) % len(openings)], index % 2 == 0)
+             for index in range(games))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        try:
+            while True:
+                # Keep only a few games queued so an SPRT stop wastes little work
+                while len(pending) < workers * 2:
+                    task = next(tasks, None)
+                    if task is None:
+                        break
+                    pending.add(pool.submit(play_game, *task, engine_a, engine_b,
+                                            base_time, increment, adjudication))
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    game = future.result()
+                    if game['score'] == 1.0:
+                        wins += 1
+                    elif game['score'] == 0.0:
+                        losses += 1
+                    else:
+                        draws += 1
+                    terminations[game['termination']] = terminations.get(game['termination'], 0) + 1
+                    if pgn_file is not None:
+                        pgn_file.write(game['pgn'] + '\n\n')
+                        pgn_file.flush()
+                    rating, error = elo_interval(wins, draws, losses)
+                    llr = sprt_llr(wins, draws, losses, elo0, elo1)
+                    print(f"Game {wins + draws + losses}/{games}: +{wins} ={draws} -{losses}  "
+                          f"Elo {rating:+.1f} ± {error:.1f}  LLR {llr:.2f} [{lower:.2f}, {upper:.2f}]")
+                if llr >= upper:
+                    verdict = 'H1'
+                elif llr <= lower:
+                    verdict = 'H0'
+                if verdict is not None:
+                    break
+        finally:
+            for future in pending:
+                future.cancel()
+            if pgn_file is not None:
+                pgn_file.close()
+    
+    rating, error = elo_interval(wins, draws, losses)
+    return {
+        'games': wins + draws + losses,
+        'wins': wins,
+        'draws': draws,
+        'losses': losses,
+        'elo': rating,
+        'elo_error': error,
+        'llr': llr,
+        'bounds': (lower, upper),
+        'verdict': verdict,
+        'terminations': terminations,
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Play two bot configurations against each other with an SPRT")
+    parser.add_argument('--a', default='', help="engine A options, e.g. 'late_move_reductions=false,hash_mb=32'")
+    parser.add_argument('--b', default='', help="engine B options (the baseline)")
+    parser.add_argument('--games', type=int, default=200)
+    parser.add_argument('--tc', default='10+0.1', help="base+increment in seconds")
+    parser.add_argument('--workers', type=int, help="games played at once (default: one per core)")
+    parser.add_argument('--openings', help="FEN/EPD lines or a PGN file (default: built-in set)")
+    parser.add_argument('--opening-plies', type=int, default=8, help="plies taken from PGN openings")
+    parser.add_argument('--pgn', default='selfplay.pgn', help="games are appended here as they finish")
+    parser.add_argument('--elo0', type=float, default=0.0)
+    parser.add_argument('--elo1', type=float, default=5.0)
+    parser.add_argument('--alpha', type=float, default=0.05)
+    parser.add_argument('--beta', type=float, default=0.05)
+    parser.add_argument('--resign-score', type=int, default=800)
+    parser.add_argument('--resign-moves', type=int, default=4)
+    parser.add_argument('--draw-score', type=int, default=10)
+    parser.add_argument('--draw-moves', type=int, default=8)
+    parser.add_argument('--draw-after', type=int, default=40, help="no draw adjudication before this move")
+    parser.add_argument('--syzygy', help="Syzygy tablebase directory for adjudication")
+    args = parser.parse_args()
+    
+    base, _, inc = args.tc.partition('+')
+    openings = load_openings(args.openings, args.opening_plies)
+    adjudication = Adjudication(args.resign_score, args.resign_moves, args.draw_score, args.draw_moves,
+                                args.draw_after, syzygy_path=args.syzygy)
+    print(f"⚔️ A [{args.a or 'default'}] vs B [{args.b or 'default'}]: up to {args.games} games, "
+          f"tc {args.tc}, {len(openings)} openings, SPRT elo0={args.elo0} elo1={args.elo1}")
+    summary = run_match(parse_engine(args.a), parse_engine(args.b), openings, games=args.games,
+                        base_time=float(base), increment=float(inc or 0), workers=args.workers,
+                        adjudication=adjudication, elo0=args.elo0, elo1=args.elo1,
+                        alpha=args.alpha, beta=args.beta, pgn_path=args.pgn)
+    print(f"Result: +{summary['wins']} ={summary['draws']} -{summary['losses']} "
+          f"in {summary['games']} games, Elo {summary['elo']:+.1f} ± {summary['elo_error']:.1f}")
+    print(f"SPRT: LLR {summary['llr']:.2f}, "
+          + {'H1': "H1 accepted (A is better)", 'H0': "H0 accepted (A is not better)",
+             None: "inconclusive"}[summary['verdict']])
+    print(f"Terminations: {summary['terminations']}")
@@ -0,0 +1,150 @@
+import chess
+from . import evaluation
+from .evaluation import MAX_PHASE, evaluate_mobility
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:  # The search falls back to the scalar evaluator
+    np = None
+    HAS_NUMPY = False
+
+# Plane order: White pawn..king, then Black pawn..king
+PLANES = [(color, piece_type) for color in (chess.WHITE, chess.BLACK) for piece_type in chess.PIECE_TYPES]
+
+def plane_index(color, piece_type):
+    return (0 if color == chess.WHITE else 6) + piece_type - 1
+
+class BatchEvaluator:
+    """
+    Scores many positions in one vectorized call. Boards are packed into
+    12x64 piece planes; material, piece-square, pawn structure and king
+    safety terms are computed with NumPy from the weights in evaluation.py.
+    Mobility needs real attack generation and is packed per board.
+    The scores are identical to evaluate_position.
+    """
+    
+    def __init__(self):
+        if not HAS_NUMPY:
+            raise ImportError("BatchEvaluator requires numpy")
+        self.score_mg = self._score_planes(evaluation.SCORE_MG)
+        self.score_eg = self._score_planes(evaluation.SCORE_EG)
+        self.phase_weights = np.array(
+            [evaluation.PHASE_WEIGHTS[piece_type] for _, piece_type in PLANES], dtype=np.int64)
+        
+        self.passed_masks = {
+            color: self._mask_matrix(evaluation.PASSED_PAWN_MASKS[color]) for color in chess.COLORS}
+        self.shield_masks = {
+            color: self._mask_matrix(evaluation.KING_SHIELD_MASKS[color]) for color in chess.COLORS}
+        # Passed pawn bonus per square, by rank from each side's point of view
+        self.passed_bonus = {
+            chess.WHITE: np.array([evaluation.PASSED_PAWN_BONUS[chess.square_rank(square)]
+                                   for square in chess.SQUARES], dtype=np.int64),
+            chess.BLACK: np.array([evaluation.PASSED_PAWN_BONUS[7 - chess.square_rank(square)]
+                                   for square in chess.SQUARES], dtype=np.int64),
+        }
+    
+    @staticmethod
+    def _score_planes(tables):
+        return np.array([tables[color][piece_type] for color, piece_type in PLANES], dtype=np.int64)
+    
+    @staticmethod
+    def _mask_matrix(masks):
+        """64x64 0/1 matrix with row s holding the bits of masks[s]"""
+        return BatchEvaluator._unpack(np.array(masks, dtype=np.uint64)).astype(np.int64)
+    
+    @staticmethod
+    def _unpack(bitboards):
+        """uint64 bitboards (any shape) -> 0/1 uint8 array with a trailing axis of 64 squares"""
+        as_bytes = bitboards.astype('<u8').view(np.uint8).reshape(bitboards.shape + (8,))
+        return np.unpackbits(as_bytes, axis=-1, bitorder='little')
+    
+    def pack(self, boards):
+        """
+        Pack boards into (planes, mobility): planes is an (N, 12, 64) 0/1
+        array, mobility the (N,) scalar mobility term of each board.
+        """
+        return self._pack_features([self._features(board) for board in boards])
+    
+    @staticmethod
+    def _features(board):
+        return [board.pieces_mask(piece_type, color) for color, piece_type in PLANES], evaluate_mobility(board)
+    
+    def _pack_features(self, features):
+        masks = np.array([masks for masks, _ in features], dtype=np.uint64).reshape(len(features), 12)
+        mobility = np.array([mobility for _, mobility in features], dtype=np.int64)
+        return self._unpack(masks), mobility
+    
+    def score(self, planes, mobility):
+        """Vectorized evaluate_position for packed boards, from White's view"""
+        planes = planes.astype(np.int64)
+        mg = np.einsum('npq,pq->n', planes, self.score_mg)
+        eg = np.einsum('npq,pq->n', planes, self.score_eg)
+        phase = planes.sum(axis=2) @ self.phase_weights
+        clipped = np.minimum(phase, MAX_PHASE)
+        tapered = (mg * clipped + eg * (MAX_PHASE - clipped)) // MAX_PHASE
+        
+        return tapered + self._pawn_structure(planes) + mobility + self._king_safety(planes, clipped)
+    
+    def _pawn_structure(self, planes):
+        score = np.zeros(planes.shape[0], dtype=np.int64)
+        for color in chess.COLORS:
+            sign = 1 if color == chess.WHITE else -1
+            pawns = planes[:, plane_index(color, chess.PAWN)]
+            enemy_pawns = planes[:, plane_index(not color, chess.PAWN)]
+            
+            # Pawns per file: squares are rank * 8 + file
+            per_file = pawns.reshape(-1, 8, 8).sum(axis=1)
+            doubled = np.maximum(per_file - 1, 0).sum(axis=1)
+            occupied_files = per_file > 0
+            neighbours = np.zeros_like(occupied_files)
+            neighbours[:, 1:] |= occupied_files[:, :-1]
+            neighbours[:, :-1] |= occupied_files[:, 1:]
+            isolated = (per_file * ~neighbours).sum(axis=1)
+            
+            blockers = enemy_pawns @ self.passed_masks[color].T
+            passed = (pawns * (blockers == 0)) @ self.passed_bonus[color]
+            
+            score += sign * (passed
+                             - evaluation.DOUBLED_PAWN_PENALTY * doubled
+                             - evaluation.ISOLATED_PAWN_PENALTY * isolated)
+        return score
+    
+    def _king_safety(self, planes, phase):
+        shield = np.zeros(planes.shape[0], dtype=np.int64)
+        for color in chess.COLORS:
+            sign = 1 if color == chess.WHITE else -1
+            kings = planes[:, plane_index(color, chess.KING)]
+            pawns = planes[:, plane_index(color, chess.PAWN)]
+            shield_squares = kings @ self.shield_masks[color]
+            shield += sign * evaluation.KING_SHIELD_BONUS * (shield_squares * pawns).sum(axis=1)
+        return (shield * phase) // MAX_PHASE
+    
+    def evaluate_batch(self, boards):
+        """Scores (White's view) for a list of boards, e.g. for offline analysis"""
+        if not boards:
+            return np.zeros(0, dtype=np.int64)
+        return self.score(*self.pack(boards))
+    
+    def score_moves(self, board, moves):
+        """Static scores (White's view) of the positions after each of moves"""
+        features = []
+        for move in moves:
+            board.push(move)
+            features.append(self._features(board))
+            board.pop()
+        if not features:
+            return np.zeros(0, dtype=np.int64)
+        return self.score(*self._pack_features(features))
+    
+    def order_moves(self, board, moves):
+        """moves sorted best first for the side to move by the static score of each child"""
+        moves = list(moves)
+        if len(moves) < 2:
+            return moves
+        scores = self.score_moves(board, moves)
+        if board.turn == chess.BLACK:
+            scores = -scores
+        # Stable argsort keeps the incoming order among equal scores
+        order = np.argsort(-scores, kind='stable')
+        return [moves[index] for index in order]
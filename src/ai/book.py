@@ -0,0 +1,135 @@
+import random
+import struct
+from collections import defaultdict
+import chess
+import chess.pgn
+import chess.polyglot
+
+# Polyglot entry: key, move, weight, learn (big-endian, 16 bytes)
+ENTRY_STRUCT = struct.Struct('>QHHI')
+MAX_WEIGHT = 0xFFFF
+
+# Book weight of a move by the game's result for the side that played it
+RESULT_WEIGHTS = {'win': 2, 'draw': 1, 'loss': 0}
+
+def encode_book_move(board, move):
+    """
+    Polyglot move encoding: to file/rank, from file/rank, promotion piece.
+    Castling is stored as the king capturing its own rook.
+    """
+    to_square = move.to_square
+    if board.is_castling(move):
+        rook_file = 7 if board.is_kingside_castling(move) else 0
+        to_square = chess.square(rook_file, chess.square_rank(move.from_square))
+    promotion = move.promotion - 1 if move.promotion else 0
+    return (chess.square_file(to_square)
+            | chess.square_rank(to_square) << 3
+            | chess.square_file(move.from_square) << 6
+            | chess.square_rank(move.from_square) << 9
+            | promotion << 12)
+
+def game_outcome(result, color):
+    """'win', 'draw', 'loss' for color from a PGN result tag, None if unfinished"""
+    if result == '1/2-1/2':
+        return 'draw'
+    if result in ('1-0', '0-1'):
+        won = (result == '1-0') == (color == chess.WHITE)
+        return 'win' if won else 'loss'
+    return None
+
+def player_rating(headers, color):
+    try:
+        return int(headers.get('WhiteElo' if color == chess.WHITE else 'BlackElo', ''))
+    except ValueError:
+        return None
+
+def book_games(paths, min_rating=None):
+    """Stream the games of the PGN files, skipping those below min_rating"""
+    for path in paths:
+        with open(path, encoding='utf-8', errors='replace') as pgn:
+            while True:
+                game = chess.pgn.read_game(pgn)
+                if game is None:
+                    break
+                if min_rating is not None:
+                    ratings = [player_rating(game.headers, color) for color in chess.COLORS]
+                    if any(rating is None or rating < min_rating for rating in ratings):
+                        continue
+                yield game
+
+def build_book(pgn_paths, output_path, max_ply=20, min_rating=None, results=None,
+               color=None, min_weight=1):
+    """
+    Build a Polyglot book from PGN files. Every move in the first max_ply
+    plies is weighted by the result for the side that played it (win 2,
+    draw 1, loss 0); unfinished games are skipped. results optionally limits
+    the games by Result tag (e.g. {'1-0'}), min_rating by both players' Elo
+    tags, and color restricts the book to the moves of one side, e.g. our
+    bot's games as White. Entries are written sorted by key and weight as
+    Polyglot expects. Returns the number of entries written.
+    """
+    weights = defaultdict(lambda: defaultdict(int))
+    for game in book_games(pgn_paths, min_rating):
+        result = game.headers.get('Result', '*')
+        if game_outcome(result, chess.WHITE) is None or (results is not None and result not in results):
+            continue
+        board = game.board()
+        for move in game.mainline_moves():
+            if board.ply() >= max_ply:
+                break
+            if color is None or board.turn == color:
+                weight = RESULT_WEIGHTS[game_outcome(result, board.turn)]
+                key = chess.polyglot.zobrist_hash(board)
+                weights[key][encode_book_move(board, move)] += weight
+            board.push(move)
+    
+    entries = []
+    for key, moves in weights.items():
+        # Scale a position's weights down together so they fit in 16 bits
+        scale = max(1, -(-max(moves.values()) // MAX_WEIGHT))
+        for raw_move, weight in moves.items():
+            weight //= scale
+            if weight >= min_weight:
+                entries.append((key, raw_move, weight))
+    entries.sort(key=lambda entry: (entry[0], -entry[2], entry[1]))
+    
+    with open(output_path, 'wb') as book:
+        for key, raw_move, weight in entries:
+            book.write(ENTRY_STRUCT.pack(key, raw_move, weight, 0))
+    return len(entries)
+
+class OpeningBook:
+    """
+    Polyglot book probe. The file is memory-mapped and binary-searched by
+    python-chess, so a lookup only touches a few pages and memory use does
+    not grow with the book size.
+    """
+    
+    def __init__(self, path, randomize=True, seed=None):
+        self.path = path
+        self.reader = chess.polyglot.MemoryMappedReader(path)
+        # Pick moves in proportion to their weight rather than always the heaviest
+        self.randomize = randomize
+        self.rng = random.Random(seed)
+        self.hits = 0
+        self.misses = 0
+    
+    def probe(self, board):
+        """A book move for board, or None when the position is not in the book"""
+        try:
+            if self.randomize:
+                entry = self.reader.weighted_choice(board, random=self.rng)
+            else:
+                entry = self.reader.find(board)
+        except IndexError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry.move
+    
+    def moves(self, board):
+        """All book moves for board with their weights, heaviest first"""
+        return [(entry.move, entry.weight) for entry in self.reader.find_all(board)]
+    
+    def close(self):
+        self.reader.close()
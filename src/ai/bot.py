@@ -1,39 +1,272 @@
+import threading
 import chess
+import chess.polyglot
+from .batch_eval import HAS_NUMPY, BatchEvaluator
+from .book import OpeningBook
 from .evaluation import evaluate_position
-from .search import minimax_search
+from ..metrics import METRICS, search_sample
+from .parallel import LazySMP, clear_root_pool, root_split_iterative, shutdown_root_pool, warm_root_pool
+from .ponder import PonderSearch
+from .search import MAX_DEPTH, SearchConfig, SearchResult, SearchState, iterative_deepening
+from .tablebase import Tablebase
+from .time_manager import TimeManager, position_volatility
+from .transposition import TranspositionTable
 
 class ChessBot:
-    def __init__(self, depth=4):
+    def __init__(self, depth=3, hash_mb=16, debug_eval=False, workers=1, parallel='lazy_smp',
+                 search_config=None, book_path=None, syzygy_path=None, syzygy_max_pieces=None):
         self.name = "SmartBot"
         self.search_depth = depth
         self.bot_color = None
+        self.hash_mb = hash_mb
+        self.tt = TranspositionTable(hash_mb)
+        # With more than one worker, searches run in worker processes using
+        # either 'lazy_smp' (shared TT) or 'root_split' (root moves divided up)
+        self.workers = workers
+        self.parallel = parallel
+        self.smp = None
+        self.last_search = None
+        self.time_manager = TimeManager()
+        # Selective search switches (null move, LMR, extensions, futility, PVS)
+        self.search_config = search_config if search_config is not None else SearchConfig()
+        # Cross-check the incremental evaluator against full evaluations (slow)
+        self.debug_eval = debug_eval
+        # Vectorized child scoring for root and PV move ordering, if numpy is installed
+        self.batch_evaluator = BatchEvaluator() if HAS_NUMPY else None
+        # Optional Polyglot opening book, probed before searching
+        self.book = OpeningBook(book_path) if book_path else None
+        # Optional Syzygy tablebases: WDL in the search, DTZ at the root
+        self.tablebase = Tablebase(syzygy_path, syzygy_max_pieces) if syzygy_path else None
+        # Background search on the opponent's time, and the lock guarding its handoff
+        self.ponder = None
+        self.ponder_lock = threading.Lock()
+        self.start()
+    
+    def start(self):
+        """
+        Start the parallel search workers and wait until they are up, so
+        process start-up is never charged to a move's clock. Called when the
+        bot is created; a search after close() calls it again.
+        """
+        if self.workers <= 1:
+            return
+        if self.parallel == 'root_split':
+            warm_root_pool(self.workers)
+        elif self.smp is None:
+            self.smp = LazySMP(self.workers, self.hash_mb)
+            self.smp.warm_up()
     
     def set_color(self, color):
         """Set the bot's color (WHITE or BLACK)"""
         self.bot_color = color
     
-    def choose_move(self, board):
-        """Choose best move using minimax search"""
+    def new_game(self):
+        """Reset per-game search state"""
+        self.stop_pondering()
+        self.tt.clear()
+        if self.smp is not None:
+            self.smp.new_game()
+        if self.workers > 1 and self.parallel == 'root_split':
+            clear_root_pool()
+    
+    def close(self):
+        """Shut down any parallel search workers"""
+        self.stop_pondering()
+        if self.book is not None:
+            self.book.close()
+            self.book = None
+        if self.tablebase is not None:
+            self.tablebase.close()
+            self.tablebase = None
+        if self.smp is not None:
+            self.smp.close()
+            self.smp = None
+        if self.workers > 1 and self.parallel == 'root_split':
+            shutdown_root_pool()
+    
+    def choose_move(self, board, time_limit=None, node_limit=None, depth=None, soft_limit=None,
+                    multipv=1, stop_event=None, on_iteration=None):
+        """
+        Choose best move using an iterative deepening negamax search.
+        Without limits the search runs to self.search_depth; with a time_limit
+        (seconds) or node_limit it goes as deep as the budget allows.
+        soft_limit (seconds) stops starting new iterations after it has passed.
+        multipv > 1 also scores the next best moves (see analyse); it always
+        uses the serial search.
+        stop_event: optional threading.Event; setting it from another thread
+        ends the search with the best move found so far
+        on_iteration: optional callback, called with the SearchResult after
+        each completed depth
+        """
         if not board.legal_moves:
             return None
+        best_move = self._choose_move(board, time_limit, node_limit, depth, soft_limit, multipv,
+                                      stop_event, on_iteration)
+        METRICS.record_search(search_sample(self.last_search))
+        return best_move
+    
+    def _choose_move(self, board, time_limit, node_limit, depth, soft_limit, multipv,
+                     stop_event, on_iteration):
+        # The ponder search shares the TT, so it must not run alongside this one
+        self.stop_pondering()
         
         # Set bot color if not already set
         if self.bot_color is None:
             self.bot_color = board.turn
         
-        # Determine if bot should maximize or minimize
-        bot_is_maximizing = (self.bot_color == chess.WHITE)
+        if self.book is not None and multipv == 1:
+            book_move = self.book.probe(board)
+            if book_move is not None:
+                self.last_search = SearchResult()
+                self.last_search.best_move = book_move
+                self.last_search.pv = [book_move]
+                self.last_search.stats = {'book': True}
+                return book_move
         
-        _, best_move = minimax_search(
-            board, 
-            self.search_depth, 
-            float('-inf'), 
-            float('inf'), 
-            bot_is_maximizing
-        )
+        root_moves = None
+        if self.tablebase is not None and multipv == 1:
+            ranked = self.tablebase.root_moves(board)
+            if ranked:
+                best, wdl, _ = ranked[0]
+                if wdl != 0:
+                    # Known win or loss: the DTZ ranking already is the best play
+                    self.last_search = SearchResult()
+                    self.last_search.best_move = best
+                    self.last_search.pv = [best]
+                    self.last_search.stats = {'tablebase': True}
+                    return best
+                # Drawn: let the search choose, but only among the drawing moves
+                root_moves = [move for move, move_wdl, _ in ranked if move_wdl == 0]
+        
+        if depth is None:
+            limited = time_limit is not None or node_limit is not None
+            depth = MAX_DEPTH if limited else self.search_depth
+        
+        if self.workers > 1 and multipv == 1 and root_moves is None and self.parallel == 'root_split':
+            self.start()
+            self.last_search = root_split_iterative(
+                board, depth, self.workers,
+                time_limit=time_limit, soft_limit=soft_limit, node_limit=node_limit,
+                stop_event=stop_event, on_iteration=on_iteration,
+                config=self.search_config, tablebase=self.tablebase, debug_eval=self.debug_eval,
+                batch_evaluator=self.batch_evaluator)
+            best_move = self.last_search.best_move
+            return best_move if best_move else list(board.legal_moves)[0]
+        
+        if self.workers > 1 and multipv == 1 and root_moves is None:
+            self.start()
+            self.last_search = self.smp.search(
+                board, depth,
+                time_limit=time_limit, soft_limit=soft_limit, node_limit=node_limit,
+                on_iteration=on_iteration, stop_event=stop_event,
+                config=self.search_config, tablebase=self.tablebase, debug_eval=self.debug_eval)
+            best_move = self.last_search.best_move
+            return best_move if best_move else list(board.legal_moves)[0]
+        
+        # Entries from earlier moves stay usable but become replaceable
+        self.tt.new_search()
+        
+        state = SearchState(self.tt, time_limit=time_limit, node_limit=node_limit,
+                            soft_limit=soft_limit, config=self.search_config,
+                            debug_eval=self.debug_eval,
+                            batch_evaluator=self.batch_evaluator,
+                            stop_event=stop_event, tablebase=self.tablebase)
+        self.last_search = iterative_deepening(board, depth, state, root_moves=root_moves,
+                                               on_iteration=on_iteration, multipv=multipv)
+        best_move = self.last_search.best_move
         
         return best_move if best_move else list(board.legal_moves)[0]
     
+    def analyse(self, board, multipv=3, time_limit=None, depth=None):
+        """
+        The best multipv moves of one search, best first: a list of dicts with
+        move, score (White's view) and pv as UCI strings.
+        """
+        if not board.legal_moves:
+            return []
+        self.choose_move(board, time_limit=time_limit, depth=depth, multipv=multipv)
+        return self.last_search.lines
+    
+    def choose_move_with_clock(self, board, time_left, increment=0.0):
+        """Choose a move using a budget derived from the remaining clock (seconds)"""
+        volatility = position_volatility(board, self.last_search)
+        budget = self.time_manager.allocate(board, time_left, increment, volatility)
+        if budget.emergency:
+            print(f"⏱️ Low on time ({time_left:.1f}s), searching shallow")
+        
+        with self.ponder_lock:
+            ponder, self.ponder = self.ponder, None
+        if ponder is not None:
+            if ponder.matches(board):
+                # Ponder hit: the search already under way gets this move's budget
+                result = ponder.hit(budget.hard, budget.soft)
+                if result is not None and result.best_move is not None:
+                    self.last_search = result
+                    METRICS.record_search(search_sample(result))
+                    return result.best_move
+            else:
+                ponder.cancel()
+        
+        return self.choose_move(
+            board,
+            time_limit=budget.hard,
+            soft_limit=budget.soft,
+            depth=budget.max_depth
+        )
+    
+    def start_pondering(self, board):
+        """
+        Start searching, in a background thread, the position after the
+        opponent's most likely reply to the move just played on board.
+        Returns the predicted reply, or None when there is nothing to ponder.
+        """
+        self.stop_pondering()
+        predicted = self.predict_reply(board)
+        if predicted is None:
+            return None
+        self.tt.new_search()
+        ponder = PonderSearch(board, predicted, self.tt, config=self.search_config,
+                              debug_eval=self.debug_eval,
+                              batch_evaluator=self.batch_evaluator, tablebase=self.tablebase)
+        with self.ponder_lock:
+            self.ponder = ponder.start()
+        return predicted
+    
+    def predict_reply(self, board):
+        """The expected reply from the last search's PV, else the TT move"""
+        if board.is_game_over() or not board.move_stack:
+            return None
+        pv = self.last_search.pv if self.last_search is not None else []
+        if len(pv) >= 2 and pv[0] == board.peek() and board.is_legal(pv[1]):
+            return pv[1]
+        entry = self.tt.probe(chess.polyglot.zobrist_hash(board))
+        if entry is not None and entry.move is not None and board.is_legal(entry.move):
+            return entry.move
+        return None
+    
+    def is_ponder_hit(self, board):
+        """Whether the running ponder search is on board's position"""
+        ponder = self.ponder
+        return ponder is not None and ponder.matches(board)
+    
+    def stop_pondering(self):
+        """Cancel any ponder search; safe to call from any thread"""
+        with self.ponder_lock:
+            ponder, self.ponder = self.ponder, None
+        if ponder is not None:
+            ponder.cancel()
+    
+    def get_search_stats(self):
+        """Counters from the last search (per-depth timings and nodes) and the TT"""
+        stats = {'tt': self.tt.stats()}
+        if self.book is not None:
+            stats['book'] = {'hits': self.book.hits, 'misses': self.book.misses}
+        if self.tablebase is not None:
+            stats['tablebase'] = self.tablebase.stats()
+        if self.last_search is not None:
+            stats.update(self.last_search.as_dict())
+        return stats
+    
     def get_evaluation(self, board):
         """Get current position evaluation from bot's perspective"""
         eval_score = evaluate_position(board)
@@ -41,5 +274,5 @@ class ChessBot:
         # If bot is black, flip the evaluation score
         if self.bot_color == chess.BLACK:
             eval_score = -eval_score
-            
+        
         return eval_score
@@ -9,65 +9,277 @@ PIECE_VALUES = {
     chess.KING: 20000
 }
 
-def evaluate_material(board):
-    white_material = 0
-    black_material = 0
+# Game phase: 24 with every minor and major piece still on the board, 0 in a pawn ending
+PHASE_WEIGHTS = {
+    chess.PAWN: 0,
+    chess.KNIGHT: 1,
+    chess.BISHOP: 1,
+    chess.ROOK: 2,
+    chess.QUEEN: 4,
+    chess.KING: 0
+}
+MAX_PHASE = 24
+
+CENTER_SQUARES = [chess.E4, chess.E5, chess.D4, chess.D5]
+CENTER_BONUS = 10
+DEVELOPMENT_BONUS = 10
+
+# White's minor pieces still on these squares count as undeveloped
+HOME_SQUARES = {
+    chess.KNIGHT: [chess.B1, chess.G1],
+    chess.BISHOP: [chess.C1, chess.F1]
+}
+
+DOUBLED_PAWN_PENALTY = 10
+ISOLATED_PAWN_PENALTY = 15
+# Indexed by rank counted from the pawn's own side
+PASSED_PAWN_BONUS = [0, 5, 10, 20, 35, 60, 100, 0]
+MOBILITY_WEIGHTS = {
+    chess.KNIGHT: 4,
+    chess.BISHOP: 3,
+    chess.ROOK: 2,
+    chess.QUEEN: 1
+}
+KING_SHIELD_BONUS = 10
+
+def build_pawn_masks():
+    """Adjacent-file masks per file and passed-pawn spans per [color][square]"""
+    adjacent = []
+    for file_index in range(8):
+        mask = 0
+        if file_index > 0:
+            mask |= chess.BB_FILES[file_index - 1]
+        if file_index < 7:
+            mask |= chess.BB_FILES[file_index + 1]
+        adjacent.append(mask)
     
-    # Count material for both sides
+    passed = {chess.WHITE: [0] * 64, chess.BLACK: [0] * 64}
     for square in chess.SQUARES:
-        piece = board.piece_at(square)
-        if piece is not None:
-            piece_value = PIECE_VALUES[piece.piece_type]
-            if piece.color == chess.WHITE:
-                white_material += piece_value
-            else:
-                black_material += piece_value
-    
-    return white_material - black_material
+        file_index = chess.square_file(square)
+        rank = chess.square_rank(square)
+        files = chess.BB_FILES[file_index] | adjacent[file_index]
+        ahead = 0
+        behind = 0
+        for other_rank in range(8):
+            if other_rank > rank:
+                ahead |= chess.BB_RANKS[other_rank]
+            elif other_rank < rank:
+                behind |= chess.BB_RANKS[other_rank]
+        passed[chess.WHITE][square] = files & ahead
+        passed[chess.BLACK][square] = files & behind
+    return adjacent, passed
+
+ADJACENT_FILES, PASSED_PAWN_MASKS = build_pawn_masks()
+
+def build_king_shield_masks():
+    """The (up to) three squares on each of the two ranks in front of a king"""
+    shields = {chess.WHITE: [0] * 64, chess.BLACK: [0] * 64}
+    for square in chess.SQUARES:
+        file_index = chess.square_file(square)
+        rank = chess.square_rank(square)
+        files = chess.BB_FILES[file_index] | ADJACENT_FILES[file_index]
+        for color, direction in ((chess.WHITE, 1), (chess.BLACK, -1)):
+            ranks = 0
+            for step in (1, 2):
+                if 0 <= rank + direction * step <= 7:
+                    ranks |= chess.BB_RANKS[rank + direction * step]
+            shields[color][square] = files & ranks
+    return shields
+
+KING_SHIELD_MASKS = build_king_shield_masks()
+
+def build_piece_square_tables():
+    """
+    Midgame and endgame piece-square tables from White's point of view.
+    Centre occupation counts in both phases; leaving minor pieces at home
+    only matters in the midgame.
+    """
+    mg = {piece_type: [0] * 64 for piece_type in chess.PIECE_TYPES}
+    eg = {piece_type: [0] * 64 for piece_type in chess.PIECE_TYPES}
+    for piece_type in chess.PIECE_TYPES:
+        for square in CENTER_SQUARES:
+            mg[piece_type][square] += CENTER_BONUS
+            eg[piece_type][square] += CENTER_BONUS
+    for piece_type, squares in HOME_SQUARES.items():
+        for square in squares:
+            mg[piece_type][square] -= DEVELOPMENT_BONUS
+    return mg, eg
+
+PST_MG, PST_EG = build_piece_square_tables()
+
+def build_score_tables(pst):
+    """Material plus piece-square value, signed so White is positive, per [color][piece_type][square]"""
+    tables = {chess.WHITE: {}, chess.BLACK: {}}
+    for piece_type in chess.PIECE_TYPES:
+        value = PIECE_VALUES[piece_type]
+        tables[chess.WHITE][piece_type] = [value + pst[piece_type][square] for square in chess.SQUARES]
+        tables[chess.BLACK][piece_type] = [-(value + pst[piece_type][chess.square_mirror(square)])
+                                           for square in chess.SQUARES]
+    return tables
+
+SCORE_MG = build_score_tables(PST_MG)
+SCORE_EG = build_score_tables(PST_EG)
+
+def taper(mg, eg, phase):
+    """Blend midgame and endgame scores by game phase"""
+    phase = min(phase, MAX_PHASE)
+    return (mg * phase + eg * (MAX_PHASE - phase)) // MAX_PHASE
+
+def evaluate_piece_squares(board):
+    """Material plus piece-square accumulators: returns (midgame, endgame, phase)"""
+    mg = 0
+    eg = 0
+    phase = 0
+    for color in chess.COLORS:
+        mg_own = SCORE_MG[color]
+        eg_own = SCORE_EG[color]
+        for piece_type in chess.PIECE_TYPES:
+            mask = board.pieces_mask(piece_type, color)
+            if not mask:
+                continue
+            mg_table = mg_own[piece_type]
+            eg_table = eg_own[piece_type]
+            for square in chess.scan_forward(mask):
+                mg += mg_table[square]
+                eg += eg_table[square]
+            phase += PHASE_WEIGHTS[piece_type] * chess.popcount(mask)
+    return mg, eg, phase
+
+def evaluate_pawn_structure(board):
+    """Doubled, isolated and passed pawns from file masks"""
+    score = 0
+    for color in chess.COLORS:
+        sign = 1 if color == chess.WHITE else -1
+        pawns = board.pieces_mask(chess.PAWN, color)
+        enemy_pawns = board.pieces_mask(chess.PAWN, not color)
+        for file_index, file_mask in enumerate(chess.BB_FILES):
+            count = chess.popcount(pawns & file_mask)
+            if not count:
+                continue
+            score -= sign * DOUBLED_PAWN_PENALTY * (count - 1)
+            if not pawns & ADJACENT_FILES[file_index]:
+                score -= sign * ISOLATED_PAWN_PENALTY * count
+        for square in chess.scan_forward(pawns):
+            if not enemy_pawns & PASSED_PAWN_MASKS[color][square]:
+                rank = chess.square_rank(square) if color == chess.WHITE else 7 - chess.square_rank(square)
+                score += sign * PASSED_PAWN_BONUS[rank]
+    return score
+
+def evaluate_mobility(board):
+    """Squares attacked by knights, bishops, rooks and queens that aren't our own pieces"""
+    score = 0
+    for color in chess.COLORS:
+        sign = 1 if color == chess.WHITE else -1
+        targets = ~board.occupied_co[color]
+        for piece_type, weight in MOBILITY_WEIGHTS.items():
+            for square in chess.scan_forward(board.pieces_mask(piece_type, color)):
+                score += sign * weight * chess.popcount(board.attacks_mask(square) & targets)
+    return score
+
+def evaluate_king_safety(board, phase):
+    """Pawn shield in front of each king, only relevant while pieces remain"""
+    shield = 0
+    for color in chess.COLORS:
+        king = board.king(color)
+        if king is None:
+            continue
+        pawns = chess.popcount(board.pieces_mask(chess.PAWN, color) & KING_SHIELD_MASKS[color][king])
+        shield += KING_SHIELD_BONUS * pawns if color == chess.WHITE else -KING_SHIELD_BONUS * pawns
+    return taper(shield, 0, phase)
+
+def evaluate_structure(board, phase):
+    """Terms that depend on piece interaction rather than single squares"""
+    return (evaluate_pawn_structure(board)
+            + evaluate_mobility(board)
+            + evaluate_king_safety(board, phase))
 
 def evaluate_position(board):
-    material_score = evaluate_material(board)
-    
-    positional_score = 0
+    """
+    Tapered material, centre control and development, plus pawn structure,
+    mobility and king safety. Positive scores favour White.
+    """
+    mg, eg, phase = evaluate_piece_squares(board)
+    return taper(mg, eg, phase) + evaluate_structure(board, phase)
+
+class IncrementalEvaluator:
+    """
+    Keeps the material and piece-square accumulators of evaluate_position
+    up to date as moves are made and unmade, so only the bitboard structure
+    terms are computed at a leaf.
+    With debug=True every evaluation is checked against a from-scratch one.
+    """
     
-    # Center control bonus
-    center_squares = [chess.E4, chess.E5, chess.D4, chess.D5]
-    for square in center_squares:
-        piece = board.piece_at(square)
-        if piece is not None:  # FIXED: Check for None first!
-            if piece.color == chess.WHITE:
-                positional_score += 10  # FIXED: Use += not =+
-            else:
-                positional_score -= 10  # FIXED: Use -= not =-
+    def __init__(self, board=None, debug=False):
+        self.debug = debug
+        self.mg = 0
+        self.eg = 0
+        self.phase = 0
+        self.stack = []
+        if board is not None:
+            self.reset(board)
     
-    # Development bonus
-    development_bonus = evaluate_development(board)
-    positional_score += development_bonus  # FIXED: Use += not =+
+    def reset(self, board):
+        """Recompute the accumulators for board from scratch"""
+        self.mg, self.eg, self.phase = evaluate_piece_squares(board)
+        self.stack = []
     
-    return material_score + positional_score
-
-def evaluate_development(board):
-    development_score = 0
+    def push(self, board, move):
+        """Update the accumulators for move, then push it on board"""
+        self.stack.append((self.mg, self.eg, self.phase))
+        if move:
+            self._apply(board, move)
+        board.push(move)
     
-    # White piece development
-    if board.piece_at(chess.B1) != chess.Piece(chess.KNIGHT, chess.WHITE):
-        development_score += 10  # FIXED: Use += not =+
-    if board.piece_at(chess.G1) != chess.Piece(chess.KNIGHT, chess.WHITE):
-        development_score += 10
-    if board.piece_at(chess.C1) != chess.Piece(chess.BISHOP, chess.WHITE):
-        development_score += 10
-    if board.piece_at(chess.F1) != chess.Piece(chess.BISHOP, chess.WHITE):
-        development_score += 10
+    def pop(self, board):
+        """Pop the last move from board and restore the accumulators"""
+        board.pop()
+        self.mg, self.eg, self.phase = self.stack.pop()
     
-    # Black piece development
-    if board.piece_at(chess.B8) != chess.Piece(chess.KNIGHT, chess.BLACK):
-        development_score -= 10  # FIXED: Use -= not =-
-    if board.piece_at(chess.G8) != chess.Piece(chess.KNIGHT, chess.BLACK):
-        development_score -= 10
-    if board.piece_at(chess.C8) != chess.Piece(chess.BISHOP, chess.BLACK):
-        development_score -= 10
-    if board.piece_at(chess.F8) != chess.Piece(chess.BISHOP, chess.BLACK):
-        development_score -= 10
+    def _apply(self, board, move):
+        color = board.turn
+        from_square = move.from_square
+        to_square = move.to_square
+        piece_type = board.piece_type_at(from_square)
+        mg_own = SCORE_MG[color]
+        eg_own = SCORE_EG[color]
+        
+        # Take the moving piece off its origin square
+        mg = self.mg - mg_own[piece_type][from_square]
+        eg = self.eg - eg_own[piece_type][from_square]
+        
+        if board.is_castling(move):
+            if chess.square_file(to_square) == 6:
+                rook_from, rook_to = to_square + 1, to_square - 1
+            else:
+                rook_from, rook_to = to_square - 2, to_square + 1
+            mg += mg_own[chess.ROOK][rook_to] - mg_own[chess.ROOK][rook_from]
+            eg += eg_own[chess.ROOK][rook_to] - eg_own[chess.ROOK][rook_from]
+        else:
+            # Remove a captured piece
+            if board.is_en_passant(move):
+                captured_square = to_square - 8 if color == chess.WHITE else to_square + 8
+                captured_type = chess.PAWN
+            else:
+                captured_square = to_square
+                captured_type = board.piece_type_at(to_square)
+            if captured_type:
+                mg -= SCORE_MG[not color][captured_type][captured_square]
+                eg -= SCORE_EG[not color][captured_type][captured_square]
+                self.phase -= PHASE_WEIGHTS[captured_type]
+        
+        # Put the piece (or its promotion) on the destination square
+        if move.promotion:
+            self.phase += PHASE_WEIGHTS[move.promotion] - PHASE_WEIGHTS[piece_type]
+            piece_type = move.promotion
+        self.mg = mg + mg_own[piece_type][to_square]
+        self.eg = eg + eg_own[piece_type][to_square]
     
-    return development_score
-
+    def evaluate(self, board):
+        """Current evaluation of board from White's view"""
+        score = taper(self.mg, self.eg, self.phase) + evaluate_structure(board, self.phase)
+        if self.debug:
+            expected = evaluate_position(board)
+            if score != expected:
+                raise AssertionError(
+                    f"Incremental evaluation {score} != {expected} for {board.fen()}")
+        return score
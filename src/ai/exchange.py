@@ -0,0 +1,69 @@
+import chess
+from .evaluation import PIECE_VALUES
+
+def captured_piece_type(board, move):
+    """Piece type removed by move, or None for a non-capture"""
+    if board.is_en_passant(move):
+        return chess.PAWN
+    return board.piece_type_at(move.to_square)
+
+def capture_gain(board, move):
+    """Material won by the capture itself (plus promotion), ignoring recaptures"""
+    victim = captured_piece_type(board, move)
+    gain = PIECE_VALUES[victim] if victim else 0
+    if move.promotion:
+        gain += PIECE_VALUES[move.promotion] - PIECE_VALUES[chess.PAWN]
+    return gain
+
+def mvv_lva(board, move):
+    """Most valuable victim / least valuable attacker score for capture ordering"""
+    victim = captured_piece_type(board, move)
+    attacker = board.piece_type_at(move.from_square)
+    score = (PIECE_VALUES[victim] if victim else 0) * 10 - PIECE_VALUES[attacker] // 10
+    if move.promotion:
+        score += PIECE_VALUES[move.promotion] * 10
+    return score
+
+def static_exchange_eval(board, move):
+    """
+    Net material outcome of move followed by the best sequence of recaptures
+    on its destination square, each side always recapturing with its least
+    valuable attacker (swap-list algorithm, x-rays included).
+    """
+    to_square = move.to_square
+    victim = captured_piece_type(board, move)
+    gains = [PIECE_VALUES[victim] if victim else 0]
+    
+    occupied = board.occupied ^ chess.BB_SQUARES[move.from_square]
+    if board.is_en_passant(move):
+        occupied ^= chess.BB_SQUARES[to_square - 8 if board.turn == chess.WHITE else to_square + 8]
+    
+    on_square = board.piece_type_at(move.from_square)
+    if move.promotion:
+        gains[0] += PIECE_VALUES[move.promotion] - PIECE_VALUES[chess.PAWN]
+        on_square = move.promotion
+    
+    side = not board.turn
+    while True:
+        attackers = board.attackers_mask(side, to_square, occupied) & occupied
+        if not attackers:
+            break
+        
+        # Recapture with the least valuable attacker
+        for piece_type in chess.PIECE_TYPES:
+            candidates = attackers & board.pieces_mask(piece_type, side)
+            if candidates:
+                attacker_square = chess.lsb(candidates)
+                break
+        
+        gains.append(PIECE_VALUES[on_square] - gains[-1])
+        occupied ^= chess.BB_SQUARES[attacker_square]
+        on_square = piece_type
+        side = not side
+    
+    # Each side may stop capturing when it would lose material
+    while len(gains) > 1:
+        last = gains.pop()
+        gains[-1] = -max(-gains[-1], last)
+    
+    return gains[0]
@@ -0,0 +1,122 @@
+import chess
+from .exchange import mvv_lva, static_exchange_eval
+
+# History scores are halved once any of them grows past this
+HISTORY_MAX = 1 << 20
+
+class OrderingTables:
+    """
+    Killer moves and history heuristic scores. They live for a whole search
+    so later iterations of iterative deepening start from what earlier ones
+    learned.
+    """
+    
+    def __init__(self, max_ply=128):
+        self.killers = [[None, None] for _ in range(max_ply)]
+        # Indexed by color * 4096 + from_square * 64 + to_square
+        self.history = [0] * (2 * 64 * 64)
+    
+    def killers_at(self, ply):
+        if ply < len(self.killers):
+            return self.killers[ply]
+        return ()
+    
+    def add_killer(self, ply, move):
+        """Remember a quiet move that caused a beta cutoff at this ply"""
+        if ply >= len(self.killers):
+            return
+        slots = self.killers[ply]
+        if slots[0] != move:
+            slots[1] = slots[0]
+            slots[0] = move
+    
+    def history_score(self, color, move):
+        return self.history[color * 4096 + move.from_square * 64 + move.to_square]
+    
+    def add_history(self, color, move, depth):
+        """Reward a quiet move that caused a cutoff, deeper searches count more"""
+        index = color * 4096 + move.from_square * 64 + move.to_square
+        self.history[index] += depth * depth
+        if self.history[index] > HISTORY_MAX:
+            self.history = [score // 2 for score in self.history]
+
+# Move picker stages, in the order they are generated
+STAGE_TT = 0
+STAGE_GOOD_CAPTURES = 1
+STAGE_KILLERS = 2
+STAGE_QUIETS = 3
+STAGE_BAD_CAPTURES = 4
+
+class MovePicker:
+    """
+    Yields legal moves in stages, generating each stage only when the
+    previous one is exhausted so a beta cutoff skips the remaining work:
+      1. the transposition table move
+      2. captures and promotions that don't lose material, by MVV-LVA
+      3. killer moves
+      4. quiet moves by history score
+      5. captures that lose material according to SEE
+    self.stage is the stage of the most recently yielded move, which the
+    search uses to decide which moves may be reduced.
+    """
+    
+    def __init__(self, board, tt_move=None, tables=None, ply=0):
+        self.board = board
+        self.tt_move = tt_move
+        self.tables = tables
+        self.ply = ply
+        self.stage = None
+    
+    def __iter__(self):
+        board = self.board
+        tables = self.tables
+        tt_move = self.tt_move
+        
+        if tt_move is not None and board.is_legal(tt_move):
+            self.stage = STAGE_TT
+            yield tt_move
+        else:
+            tt_move = None
+        
+        # Non-captures; castling is generated as a king move onto our own rook
+        non_capture_mask = chess.BB_ALL & ~board.occupied_co[not board.turn]
+        
+        # Captures and promotions
+        tactical = [move for move in board.generate_legal_captures() if move != tt_move]
+        tactical += [move for move in board.generate_legal_moves(to_mask=non_capture_mask)
+                     if move.promotion and move != tt_move and not board.is_en_passant(move)]
+        tactical.sort(key=lambda move: mvv_lva(board, move), reverse=True)
+        
+        losing = []
+        self.stage = STAGE_GOOD_CAPTURES
+        for move in tactical:
+            if move.promotion is None and static_exchange_eval(board, move) < 0:
+                losing.append(move)
+            else:
+                yield move
+        
+        # Killers are only known to be good for this ply, so they must be checked for legality
+        killers = []
+        if tables is not None:
+            self.stage = STAGE_KILLERS
+            for killer in tables.killers_at(self.ply):
+                if (killer is not None and killer != tt_move and not killer.promotion
+                        and not board.is_capture(killer) and board.is_legal(killer)):
+                    killers.append(killer)
+                    yield killer
+        
+        quiets = [move for move in board.generate_legal_moves(to_mask=non_capture_mask)
+                  if not move.promotion and not board.is_en_passant(move)
+                  and move != tt_move and move not in killers]
+        if tables is not None:
+            color = board.turn
+            quiets.sort(key=lambda move: tables.history_score(color, move), reverse=True)
+        self.stage = STAGE_QUIETS
+        yield from quiets
+        
+        self.stage = STAGE_BAD_CAPTURES
+        yield from losing
+
+def pick_moves(board, tt_move=None, tables=None, ply=0):
+    """Iterate over the legal moves in MovePicker order"""
+    return iter(MovePicker(board, tt_move, tables, ply))
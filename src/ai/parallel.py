@@ -0,0 +1,521 @@
+import multiprocessing
+import queue
+import random
+import time
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
+import chess
+from .batch_eval import HAS_NUMPY, BatchEvaluator
+from .search import (SearchAborted, SearchResult, SearchState, iterative_deepening,
+                     make_move, negamax, order_moves, principal_variation, unmake_move)
+from .tablebase import Tablebase
+from .transposition import SharedTranspositionTable, TranspositionTable
+
+# How long to wait for workers to acknowledge a stop before giving up on them
+STOP_TIMEOUT = 2.0
+# How long a freshly spawned worker may take to import its modules and start
+STARTUP_TIMEOUT = 60.0
+
+def merge_stats(total, stats):
+    """Add one search's stat counters to total, in place"""
+    for key, value in stats.items():
+        total[key] = total.get(key, 0) + value
+
+def lazy_smp_worker(worker_id, tt_name, tasks, results, stop_event):
+    """
+    Worker process loop: search each task's root position with the shared
+    TT and report every completed depth to the coordinator. Tablebases are
+    opened in the worker from the task's (path, max pieces) and kept open
+    while later tasks ask for the same ones.
+    """
+    tt = SharedTranspositionTable(name=tt_name)
+    batch_evaluator = BatchEvaluator() if HAS_NUMPY else None
+    rng = random.Random(worker_id)
+    tablebase = tablebase_spec = None
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            (search_id, fen, moves, max_depth, time_limit, soft_limit, node_limit,
+             config, task_tablebase, debug_eval) = task
+            if task_tablebase != tablebase_spec:
+                if tablebase is not None:
+                    tablebase.close()
+                tablebase = Tablebase(*task_tablebase) if task_tablebase is not None else None
+                tablebase_spec = task_tablebase
+            
+            board = chess.Board(fen)
+            for move in moves:
+                board.push_uci(move)
+            state = SearchState(tt, time_limit=time_limit, node_limit=node_limit,
+                                soft_limit=soft_limit, config=config, debug_eval=debug_eval,
+                                batch_evaluator=batch_evaluator, stop_event=stop_event,
+                                tablebase=tablebase)
+            
+            # Helpers diversify: odd workers start one ply deeper and every
+            # helper tries the root moves after the first in its own order
+            root_moves = order_moves(board)
+            if worker_id > 0 and len(root_moves) > 2:
+                rest = root_moves[1:]
+                rng.shuffle(rest)
+                root_moves = root_moves[:1] + rest
+            start_depth = min(max_depth, 1 + worker_id % 2)
+            
+            def report(result):
+                results.put(('iteration', search_id, worker_id, result.depth, result.score,
+                             result.best_move.uci(), [move.uci() for move in result.pv],
+                             state.nodes, state.qnodes, result.stats))
+            
+            result = iterative_deepening(board, max_depth, state,
+                                         root_moves=root_moves, start_depth=start_depth,
+                                         on_iteration=report)
+            best = result.best_move.uci() if result.best_move else None
+            results.put(('done', search_id, worker_id, result.depth, result.score, best,
+                         [move.uci() for move in result.pv], state.nodes, state.qnodes,
+                         state.search_stats()))
+    finally:
+        if tablebase is not None:
+            tablebase.close()
+        tt.close()
+
+class LazySMP:
+    """
+    Lazy SMP search: N persistent worker processes search the same root
+    position, sharing one lockless transposition table. The coordinator
+    returns the move and PV of the deepest completed iteration, with the
+    node counts and search stats summed over all workers.
+    """
+    
+    def __init__(self, workers=2, hash_mb=64):
+        self.workers = workers
+        self.tt = SharedTranspositionTable(hash_mb)
+        # Spawned (not forked) so workers don't inherit the bot's network threads
+        self.context = multiprocessing.get_context('spawn')
+        self.results = self.context.Queue()
+        self.stop_event = self.context.Event()
+        self.task_queues = []
+        self.processes = []
+        self.search_id = 0
+        for worker_id in range(workers):
+            tasks = self.context.Queue()
+            process = self.context.Process(
+                target=lazy_smp_worker,
+                args=(worker_id, self.tt.name, tasks, self.results, self.stop_event),
+                daemon=True
+            )
+            process.start()
+            self.task_queues.append(tasks)
+            self.processes.append(process)
+    
+    def new_game(self):
+        self.tt.clear()
+    
+    def warm_up(self):
+        """Wait until every worker process is up, with a depth 1 search that is then forgotten"""
+        self.search(chess.Board(), 1)
+        self.tt.clear()
+    
+    def stop(self):
+        """Stop the running search; the coordinator returns what it has"""
+        self.stop_event.set()
+    
+    def search(self, board, max_depth, time_limit=None, soft_limit=None,
+               node_limit=None, on_iteration=None, stop_event=None,
+               config=None, tablebase=None, debug_eval=False):
+        """
+        Run one parallel search and return a SearchResult. Setting the
+        optional threading.Event stop_event ends it like stop(). config
+        (SearchConfig), tablebase (Tablebase) and debug_eval are passed on
+        to every worker's search.
+        """
+        self.search_id += 1
+        self.stop_event.clear()
+        self.tt.new_search()
+        start = time.monotonic()
+        
+        # Workers replay the game so repetition detection works as in a serial search
+        root = board.root()
+        moves = [move.uci() for move in board.move_stack]
+        worker_nodes = node_limit // self.workers if node_limit else None
+        tablebase_spec = (tablebase.path, tablebase.max_pieces) if tablebase is not None else None
+        task = (self.search_id, root.fen(), moves, max_depth,
+                time_limit, soft_limit, worker_nodes, config, tablebase_spec, debug_eval)
+        for tasks in self.task_queues:
+            tasks.put(task)
+        
+        result = SearchResult()
+        nodes = {}
+        qnodes = {}
+        stats = {}
+        finished = set()
+        stop_deadline = None
+        deadline = start + time_limit if time_limit is not None else None
+        
+        while len(finished) < self.workers:
+            now = time.monotonic()
+            if stop_deadline is None and deadline is not None and now >= deadline:
+                self.stop_event.set()
+            if stop_event is not None and stop_event.is_set():
+                self.stop_event.set()
+            if self.stop_event.is_set() and stop_deadline is None:
+                stop_deadline = now + STOP_TIMEOUT
+            if stop_deadline is not None and now >= stop_deadline:
+                print("⚠️ Lazy SMP workers did not stop in time")
+                break
+            
+            try:
+                message = self.results.get(timeout=0.01)
+            except queue.Empty:
+                continue
+            (kind, search_id, worker_id, depth, score, move, pv,
+             worker_nodes, worker_qnodes, worker_stats) = message
+            if search_id != self.search_id:
+                continue  # Late report from an earlier search
+            
+            nodes[worker_id] = worker_nodes
+            qnodes[worker_id] = worker_qnodes
+            stats[worker_id] = worker_stats
+            if move is not None and depth > result.depth:
+                result.depth = depth
+                result.score = score
+                result.best_move = chess.Move.from_uci(move)
+                result.pv = [chess.Move.from_uci(uci) for uci in pv]
+                result.iterations.append({
+                    'depth': depth,
+                    'score': score,
+                    'move': move,
+                    'pv': pv,
+                    'nodes': sum(nodes.values()),
+                    'time': time.monotonic() - start,
+                    'worker': worker_id,
+                })
+                if on_iteration is not None:
+                    result.nodes = sum(nodes.values())
+                    result.qnodes = sum(qnodes.values())
+                    result.elapsed = time.monotonic() - start
+                    on_iteration(result)
+            
+            if kind == 'done':
+                finished.add(worker_id)
+                # Once one worker has finished its search the rest are only helping
+                self.stop_event.set()
+        
+        result.nodes = sum(nodes.values())
+        result.qnodes = sum(qnodes.values())
+        result.elapsed = time.monotonic() - start
+        for worker_stats in stats.values():
+            merge_stats(result.stats, worker_stats)
+        return result
+    
+    def close(self):
+        """Shut the workers down and free the shared table"""
+        self.stop_event.set()
+        for tasks in self.task_queues:
+            tasks.put(None)
+        for process in self.processes:
+            process.join(timeout=STOP_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+        self.tt.close()
+
+# Root splitting: the legal root moves are divided between the workers of a
+# process pool that is created once per process and reused for every search.
+ROOT_BOUND_SLOTS = 64
+NO_BOUND = -(1 << 62)
+ROOT_WORKER_HASH_MB = 16
+
+root_pool = None
+root_pool_workers = 0
+root_bounds = None
+root_stop = None
+# Bumped by clear_root_pool; a worker clears its TT when it sees a new value
+root_generation = None
+root_search_count = 0
+
+worker_bounds = None
+worker_stop = None
+worker_barrier = None
+worker_generation = None
+worker_seen_generation = 0
+worker_tt = None
+worker_batch_evaluator = None
+# The tablebase a worker has open, and the (path, max pieces) it was opened from
+worker_tablebase = None
+worker_tablebase_spec = None
+
+def init_root_worker(bounds, stop_event, barrier, generation):
+    """Pool initializer: keep the shared bounds, stop flag and generation and a per-process TT"""
+    global worker_bounds, worker_stop, worker_barrier, worker_generation, worker_seen_generation
+    global worker_tt, worker_batch_evaluator
+    worker_bounds = bounds
+    worker_stop = stop_event
+    worker_barrier = barrier
+    worker_generation = generation
+    worker_seen_generation = generation.value
+    worker_tt = TranspositionTable(ROOT_WORKER_HASH_MB)
+    worker_batch_evaluator = BatchEvaluator() if HAS_NUMPY else None
+
+def root_worker_tablebase(spec):
+    """The worker's tablebase for a task's (path, max pieces), opened on first use"""
+    global worker_tablebase, worker_tablebase_spec
+    if spec != worker_tablebase_spec:
+        if worker_tablebase is not None:
+            worker_tablebase.close()
+        worker_tablebase = Tablebase(*spec) if spec is not None else None
+        worker_tablebase_spec = spec
+    return worker_tablebase
+
+def get_root_pool(workers):
+    """The process-wide root splitting pool, created on first use"""
+    global root_pool, root_pool_workers, root_bounds, root_stop, root_generation
+    if root_pool is None or root_pool_workers != workers:
+        if root_pool is not None:
+            root_pool.shutdown(cancel_futures=True)
+        context = multiprocessing.get_context('spawn')
+        root_bounds = context.Array('q', ROOT_BOUND_SLOTS)
+        root_stop = context.Event()
+        root_generation = context.Value('q', 0)
+        root_pool = ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                        initializer=init_root_worker,
+                                        initargs=(root_bounds, root_stop, context.Barrier(workers),
+                                                  root_generation))
+        root_pool_workers = workers
+    return root_pool
+
+def root_worker_ready():
+    """Warm-up task: returns once every worker of the pool is running one"""
+    worker_barrier.wait(STARTUP_TIMEOUT)
+
+def warm_root_pool(workers):
+    """
+    Create the pool if needed and wait until all its processes are up. The
+    executor only spawns workers as tasks arrive, so without this the first
+    searches would pay for process start-up.
+    """
+    previous = root_pool
+    pool = get_root_pool(workers)
+    if pool is not previous:
+        # Each task blocks until all are running, so every worker must take one
+        for future in [pool.submit(root_worker_ready) for _ in range(workers)]:
+            future.result()
+    return pool
+
+def clear_root_pool():
+    """Make every pool worker clear its TT before its next task (e.g. for a new game)"""
+    if root_pool is not None:
+        with root_generation.get_lock():
+            root_generation.value += 1
+
+def shutdown_root_pool():
+    """Stop the pool's worker processes; the next search starts a new pool"""
+    global root_pool, root_pool_workers
+    if root_pool is not None:
+        root_pool.shutdown(cancel_futures=True)
+        root_pool = None
+        root_pool_workers = 0
+
+def search_root_moves(fen, history, moves, depth, slot, time_limit, node_limit, abortable,
+                      new_search, config=None, tablebase_spec=None, debug_eval=False):
+    """
+    Worker task: search a subset of the root moves. moves is a list of
+    (root index, uci). Before each move the best score found so far by any
+    worker (from the side to move's view) is read from the shared slot and
+    used as the bound. Scores are from the side to move's view. With
+    abortable set the search also ends when the pool's stop flag is raised.
+    config, tablebase_spec ((path, max pieces)) and debug_eval set up the
+    search like the bot's own.
+    Returns ([(index, score, pv)], nodes, qnodes, stats, aborted); pv (UCI
+    strings) is only given for the moves that improved on this worker's best.
+    """
+    global worker_seen_generation
+    board = chess.Board(fen)
+    for move in history:
+        board.push_uci(move)
+    if worker_generation.value != worker_seen_generation:
+        worker_seen_generation = worker_generation.value
+        worker_tt.clear()
+    if new_search:
+        worker_tt.new_search()
+    state = SearchState(worker_tt, time_limit=time_limit, node_limit=node_limit,
+                        config=config, debug_eval=debug_eval,
+                        batch_evaluator=worker_batch_evaluator, stop_event=worker_stop,
+                        tablebase=root_worker_tablebase(tablebase_spec))
+    state.begin(board)
+    state.can_abort = abortable
+    
+    results = []
+    best_score = -float('inf')
+    for index, uci in moves:
+        # One below the best so far: a move that ties it still gets an exact score
+        bound = worker_bounds[slot]
+        alpha = bound - 1 if bound != NO_BOUND else float('-inf')
+        
+        move = chess.Move.from_uci(uci)
+        make_move(board, move, state)
+        try:
+            score = -negamax(board, depth - 1, float('-inf'), -alpha, state, 1)
+        except SearchAborted:
+            return results, state.nodes, state.qnodes, state.search_stats(), True
+        finally:
+            unmake_move(board, state)
+        pv = None
+        if score > best_score:
+            best_score = score
+            pv = [pv_move.uci() for pv_move in principal_variation(board, move, state.tt, depth)]
+        results.append((index, score, pv))
+        
+        with worker_bounds.get_lock():
+            if score > worker_bounds[slot]:
+                worker_bounds[slot] = score
+    
+    return results, state.nodes, state.qnodes, state.search_stats(), False
+
+def root_split_search(board, depth, workers=4, root_moves=None, time_limit=None,
+                      node_limit=None, stop_event=None, config=None, tablebase=None,
+                      debug_eval=False):
+    """
+    Fixed-depth search with the root moves split across the shared pool.
+    Results are merged deterministically: best score, ties going to the
+    earliest move in root order. With plain alpha-beta (SearchConfig without
+    PVS, null move, LMR and futility pruning) the score is the serial
+    search's and the move is the serial one or one of equal score (see
+    bench.py split). Selective pruning depends on the window, TT and
+    ordering history, which differ between the workers and a serial
+    search, so then the move and score can differ.
+    node_limit is shared out between the workers; setting the optional
+    threading.Event stop_event aborts the search. config (SearchConfig),
+    tablebase (Tablebase) and debug_eval are passed on to the workers.
+    Returns (SearchResult of this depth, root moves re-sorted best first,
+    complete); the result's node counts and stats are summed over the
+    workers, even when the search was incomplete.
+    """
+    global root_search_count
+    result = SearchResult()
+    if root_moves is None:
+        root_moves = order_moves(board)
+    if not root_moves:
+        return result, [], True
+    
+    pool = get_root_pool(workers)
+    slot = root_search_count % ROOT_BOUND_SLOTS
+    root_search_count += 1
+    root_bounds[slot] = NO_BOUND
+    root_stop.clear()
+    
+    root = board.root()
+    history = [move.uci() for move in board.move_stack]
+    indexed = [(index, move.uci()) for index, move in enumerate(root_moves)]
+    used = min(workers, len(indexed))
+    worker_nodes = max(1, node_limit // used) if node_limit is not None else None
+    abortable = time_limit is not None or node_limit is not None or stop_event is not None
+    tablebase_spec = (tablebase.path, tablebase.max_pieces) if tablebase is not None else None
+    # Round-robin so every worker starts with one of the best-ordered moves
+    futures = [
+        pool.submit(search_root_moves, root.fen(), history, indexed[worker::workers],
+                    depth, slot, time_limit, worker_nodes, abortable, depth == 1,
+                    config, tablebase_spec, debug_eval)
+        for worker in range(used)
+    ]
+    
+    # Pass a stop from the caller's thread on to the workers
+    pending = futures
+    while pending:
+        _, pending = wait(pending, timeout=0.01, return_when=FIRST_EXCEPTION)
+        if stop_event is not None and stop_event.is_set():
+            root_stop.set()
+    
+    scores = {}
+    pvs = {}
+    complete = True
+    for future in futures:
+        results, nodes, qnodes, stats, aborted = future.result()
+        for index, score, pv in results:
+            scores[index] = score
+            if pv is not None:
+                pvs[index] = pv
+        result.nodes += nodes
+        result.qnodes += qnodes
+        merge_stats(result.stats, stats)
+        complete = complete and not aborted
+    
+    if not scores:
+        return result, root_moves, False
+    
+    searched = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    best_index, best_score = searched[0]
+    perspective = 1 if board.turn == chess.WHITE else -1
+    result.depth = depth
+    result.score = perspective * best_score
+    result.best_move = root_moves[best_index]
+    # The earliest of equal scores in a worker's moves always improved on its best
+    result.pv = [chess.Move.from_uci(uci) for uci in pvs[best_index]]
+    ordered = [root_moves[index] for index, _ in searched]
+    ordered += [move for index, move in enumerate(root_moves) if index not in scores]
+    return result, ordered, complete
+
+def root_split_iterative(board, max_depth, workers=4, time_limit=None, soft_limit=None,
+                         node_limit=None, stop_event=None, on_iteration=None,
+                         config=None, tablebase=None, debug_eval=False, batch_evaluator=None):
+    """
+    Iterative deepening on top of root_split_search; returns a SearchResult.
+    Like the serial search, the limits and stop_event only apply once the
+    first iteration has produced a move. on_iteration is called with the
+    result after each completed depth. config, tablebase and debug_eval
+    are passed on to the workers; batch_evaluator orders the root moves as
+    in the serial search.
+    """
+    result = SearchResult()
+    start = time.monotonic()
+    root_moves = order_moves(board)
+    if batch_evaluator is not None:
+        root_moves = batch_evaluator.order_moves(board, root_moves)
+    if not root_moves:
+        return result
+    
+    for depth in range(1, max_depth + 1):
+        remaining = remaining_nodes = stop = None
+        if result.best_move is not None:
+            if time_limit is not None:
+                remaining = time_limit - (time.monotonic() - start)
+                if remaining <= 0:
+                    break
+            if node_limit is not None:
+                remaining_nodes = node_limit - result.nodes
+                if remaining_nodes <= 0:
+                    break
+            if stop_event is not None and stop_event.is_set():
+                break
+            stop = stop_event
+        iteration_start = time.monotonic()
+        iteration, root_moves, complete = root_split_search(
+            board, depth, workers, root_moves, remaining, remaining_nodes, stop,
+            config, tablebase, debug_eval)
+        result.nodes += iteration.nodes
+        result.qnodes += iteration.qnodes
+        merge_stats(result.stats, iteration.stats)
+        if not complete:
+            break
+        
+        result.best_move = iteration.best_move
+        result.score = iteration.score
+        result.depth = depth
+        result.pv = iteration.pv
+        result.iterations.append({
+            'depth': depth,
+            'score': result.score,
+            'move': result.best_move.uci(),
+            'pv': [move.uci() for move in result.pv],
+            'nodes': iteration.nodes,
+            'qnodes': iteration.qnodes,
+            'time': time.monotonic() - iteration_start,
+        })
+        if on_iteration is not None:
+            result.elapsed = time.monotonic() - start
+            on_iteration(result)
+        if len(root_moves) == 1:
+            break
+        if soft_limit is not None and time.monotonic() - start >= soft_limit:
+            break
+    
+    result.elapsed = time.monotonic() - start
+    return result
@@ -0,0 +1,58 @@
+import threading
+import chess
+import chess.polyglot
+from .search import MAX_DEPTH, SearchState, iterative_deepening
+
+# How long to wait for a cancelled ponder search to unwind
+PONDER_STOP_TIMEOUT = 2.0
+
+class PonderSearch:
+    """
+    Background search of the position after the opponent's expected reply,
+    run while the opponent thinks. The search has no budget until the
+    prediction is confirmed: hit() gives it one and waits for the result,
+    cancel() stops it. Either way the TT keeps what it found.
+    """
+    
+    def __init__(self, board, predicted, tt, config=None, batch_evaluator=None, tablebase=None,
+                 debug_eval=False):
+        self.predicted = predicted
+        self.board = board.copy()
+        self.board.push(predicted)
+        self.key = chess.polyglot.zobrist_hash(self.board)
+        self.stop_event = threading.Event()
+        self.state = SearchState(tt, config=config, debug_eval=debug_eval,
+                                 batch_evaluator=batch_evaluator,
+                                 stop_event=self.stop_event, tablebase=tablebase)
+        self.result = None
+        self.thread = threading.Thread(target=self._run, name='ponder', daemon=True)
+    
+    def start(self):
+        self.thread.start()
+        return self
+    
+    def _run(self):
+        self.result = iterative_deepening(self.board, MAX_DEPTH, self.state)
+    
+    def matches(self, board):
+        """Whether board is the position being pondered (the prediction was right)"""
+        return (chess.polyglot.zobrist_hash(board) == self.key
+                and board.move_stack[-1:] == [self.predicted])
+    
+    def hit(self, time_limit, soft_limit=None):
+        """
+        The opponent played the predicted move: keep searching under the
+        given budget (seconds from now) and return the SearchResult.
+        """
+        self.state.set_limits(time_limit, soft_limit)
+        self.thread.join(time_limit + PONDER_STOP_TIMEOUT)
+        if self.thread.is_alive():
+            self.cancel()
+        return self.result
+    
+    def cancel(self):
+        """Stop the search and wait for its thread to exit"""
+        self.stop_event.set()
+        self.thread.join(PONDER_STOP_TIMEOUT)
+        if self.thread.is_alive():
+            print("⚠️ Ponder search did not stop in time")
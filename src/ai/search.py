@@ -1,65 +1,678 @@
+import time
 import chess
-from .evaluation import evaluate_position
+import chess.polyglot
+from .evaluation import IncrementalEvaluator, evaluate_position
+from .exchange import capture_gain, mvv_lva, static_exchange_eval
+from .move_picker import STAGE_BAD_CAPTURES, STAGE_QUIETS, MovePicker, OrderingTables, pick_moves
+from .tablebase import tablebase_score
+from .transposition import EXACT, LOWER, UPPER
 
-def minimax_search(board, depth, alpha, beta, maximizing_player):
+MAX_DEPTH = 64
+
+# Hard limit on search ply, in case extensions keep a line going
+MAX_PLY = 100
+
+# Score for delivering checkmate; mates found sooner score higher
+MATE_SCORE = 100000
+# Scores beyond this are mate scores
+MATE_BOUND = MATE_SCORE - 1000
+
+# Delta pruning: skip captures that can't lift the score to alpha even with this margin
+DELTA_MARGIN = 200
+
+# Aspiration windows: half-width around the previous iteration's score, used
+# from this depth on; the window doubles on each failure and is dropped past the maximum
+ASPIRATION_WINDOW = 50
+ASPIRATION_MIN_DEPTH = 4
+ASPIRATION_MAX_WINDOW = 800
+
+# Batch-evaluated move ordering is only worth its cost at PV nodes this deep
+BATCH_ORDER_DEPTH = 3
+
+# How many nodes to search between clock checks
+CHECK_INTERVAL = 256
+
+class SearchAborted(Exception):
+    """Raised inside the search when the time or node budget runs out"""
+
+class SearchConfig:
+    """Switches and parameters for the selective search features"""
+    
+    def __init__(self, pvs=True, null_move=True, late_move_reductions=True,
+                 check_extensions=True, futility_pruning=True, qsearch_checks=False,
+                 null_move_reduction=2, null_move_min_depth=3, null_move_verify_depth=6,
+                 lmr_min_depth=3, lmr_min_moves=3, futility_margins=(0, 200, 350)):
+        # Principal variation search: null-window searches after the first move
+        self.pvs = pvs
+        # Null-move pruning, never in check or with only king and pawns left
+        self.null_move = null_move
+        self.null_move_reduction = null_move_reduction
+        self.null_move_min_depth = null_move_min_depth
+        # From this depth a null-move cutoff is verified by a reduced normal search
+        self.null_move_verify_depth = null_move_verify_depth
+        # Late move reductions for quiet moves and losing captures
+        self.late_move_reductions = late_move_reductions
+        self.lmr_min_depth = lmr_min_depth
+        self.lmr_min_moves = lmr_min_moves
+        # Search one ply deeper when the side to move is in check
+        self.check_extensions = check_extensions
+        # Skip quiet moves at frontier nodes whose static eval is far below alpha;
+        # futility_margins[depth] applies at that remaining depth
+        self.futility_pruning = futility_pruning
+        self.futility_margins = futility_margins
+        # Include quiet checks at the first quiescence ply
+        self.qsearch_checks = qsearch_checks
+
+class SearchState:
+    """Bookkeeping shared by every node of one search: budget, counters and TT"""
+    
+    def __init__(self, tt=None, time_limit=None, node_limit=None, soft_limit=None,
+                 config=None, debug_eval=False, batch_evaluator=None, stop_event=None,
+                 tablebase=None):
+        self.tt = tt
+        # Optional Syzygy Tablebase probed for WDL inside the tree
+        self.tablebase = tablebase
+        self.config = config if config is not None else SearchConfig()
+        # Optional BatchEvaluator used to order moves at the root and PV nodes
+        self.batch_evaluator = batch_evaluator
+        self.nodes = 0
+        # Quiescence share of self.nodes
+        self.qnodes = 0
+        # Per-feature counters; *_nodes entries count nodes spent inside that feature
+        self.stats = {
+            'tt_cutoffs': 0,
+            'null_move_tries': 0,
+            'null_move_cutoffs': 0,
+            'null_move_nodes': 0,
+            'lmr_reductions': 0,
+            'lmr_researches': 0,
+            'lmr_nodes': 0,
+            'pvs_researches': 0,
+            'aspiration_researches': 0,
+            'check_extensions': 0,
+            'check_extension_nodes': 0,
+            'futility_prunes': 0,
+            'futility_nodes': 0,
+            'tb_hits': 0,
+        }
+        # Killer and history tables, kept across iterations
+        self.ordering = OrderingTables()
+        self.root_ply = 0
+        # Incremental evaluator, attached to the root position by begin()
+        self.evaluator = None
+        self.tt_start = (0, 0)
+        self.debug_eval = debug_eval
+        self.start_time = time.monotonic()
+        self.deadline = self.start_time + time_limit if time_limit is not None else None
+        # No new iteration is started once the soft limit has passed
+        self.soft_deadline = self.start_time + soft_limit if soft_limit is not None else None
+        self.node_limit = node_limit
+        # Budgets are only enforced once a complete iteration has produced a move
+        self.can_abort = False
+        self.stopped = False
+        # Optional threading/multiprocessing Event that stops the search from outside
+        self.stop_event = stop_event
+    
+    def begin(self, board):
+        """Attach the search to its root position"""
+        self.root_ply = board.ply()
+        self.evaluator = IncrementalEvaluator(board, debug=self.debug_eval)
+        # TT counters at the start, so search_stats() reports this search only
+        self.tt_start = (self.tt.hits, self.tt.misses) if self.tt is not None else (0, 0)
+    
+    def search_stats(self):
+        """The feature counters plus this search's TT probes and hits"""
+        stats = dict(self.stats)
+        if self.tt is not None:
+            hits = self.tt.hits - self.tt_start[0]
+            stats['tt_hits'] = hits
+            stats['tt_probes'] = hits + self.tt.misses - self.tt_start[1]
+        return stats
+    
+    def set_limits(self, time_limit=None, soft_limit=None):
+        """Replace the time budget, counted from now (e.g. when a ponder search is confirmed)"""
+        now = time.monotonic()
+        self.deadline = now + time_limit if time_limit is not None else None
+        self.soft_deadline = now + soft_limit if soft_limit is not None else None
+    
+    def elapsed(self):
+        return time.monotonic() - self.start_time
+    
+    def soft_limit_reached(self):
+        return self.soft_deadline is not None and time.monotonic() >= self.soft_deadline
+    
+    def stop_requested(self):
+        return self.stopped or (self.stop_event is not None and self.stop_event.is_set())
+    
+    def stop(self):
+        """Ask a running search to unwind as soon as possible"""
+        self.stopped = True
+    
+    def count_node(self):
+        """Count a visited node and abort when the budget is exhausted"""
+        self.nodes += 1
+        if not self.can_abort:
+            return
+        if self.stopped:
+            raise SearchAborted()
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            self.stopped = True
+            raise SearchAborted()
+        if self.nodes % CHECK_INTERVAL == 0:
+            if self.deadline is not None and time.monotonic() >= self.deadline:
+                self.stopped = True
+                raise SearchAborted()
+            if self.stop_event is not None and self.stop_event.is_set():
+                self.stopped = True
+                raise SearchAborted()
+
+class SearchResult:
+    """Outcome of an iterative deepening search"""
+    
+    def __init__(self):
+        self.best_move = None
+        self.score = 0
+        self.depth = 0
+        self.nodes = 0
+        self.qnodes = 0
+        self.elapsed = 0.0
+        # Principal variation of the best move
+        self.pv = []
+        # Multi-PV lines, best first: dicts with move, score and pv (UCI strings)
+        self.lines = []
+        # One dict per completed depth: depth, score, move, pv, nodes, time
+        self.iterations = []
+        self.stats = {}
+    
+    def as_dict(self):
+        return {
+            'best_move': self.best_move.uci() if self.best_move else None,
+            'score': self.score,
+            'depth': self.depth,
+            'pv': [move.uci() for move in self.pv],
+            'lines': self.lines,
+            'nodes': self.nodes,
+            'qnodes': self.qnodes,
+            'elapsed': self.elapsed,
+            'iterations': self.iterations,
+            'stats': self.stats,
+        }
+
+def iterative_deepening(board, max_depth, state, root_moves=None, start_depth=1,
+                        on_iteration=None, multipv=1):
     """
-    Minimax with alpha-beta pruning for efficient search
-    maximizing_player: True if current player should maximize, False if minimize
+    Search depth 1, 2, 3... until max_depth or the state's budget runs out.
+    Returns a SearchResult holding the best move of the last completed
+    iteration; its scores are from White's view.
+    root_moves: optional initial root move order
+    start_depth: first depth to search (parallel helpers start at different depths)
+    on_iteration: optional callback, called with the SearchResult after each completed depth
+    multipv: number of best root moves to return with exact scores and PVs (result.lines)
     """
-    if depth == 0 or board.is_game_over():
-        return evaluate_position(board), None
+    result = SearchResult()
+    state.begin(board)
+    if root_moves is None:
+        root_moves = order_moves(board)
+        if state.batch_evaluator is not None:
+            root_moves = state.batch_evaluator.order_moves(board, root_moves)
+    if not root_moves:
+        return result
+    perspective = 1 if board.turn == chess.WHITE else -1
+    previous = None
+    
+    for depth in range(start_depth, max_depth + 1):
+        nodes_before = state.nodes
+        qnodes_before = state.qnodes
+        iteration_start = time.monotonic()
+        try:
+            score, best_move, scored = aspiration_search(board, depth, state, root_moves, previous, multipv)
+        except SearchAborted:
+            break
+        root_moves = [move for _, move in scored]
+        previous = score
+        
+        lines = [{'move': move.uci(),
+                  'score': perspective * line_score,
+                  'pv': [pv_move.uci() for pv_move in principal_variation(board, move, state.tt, depth)]}
+                 for line_score, move in scored[:multipv]]
+        result.best_move = best_move
+        result.score = perspective * score
+        result.depth = depth
+        result.pv = [chess.Move.from_uci(uci) for uci in lines[0]['pv']]
+        result.lines = lines
+        result.iterations.append({
+            'depth': depth,
+            'score': result.score,
+            'move': best_move.uci(),
+            'pv': lines[0]['pv'],
+            'nodes': state.nodes - nodes_before,
+            'qnodes': state.qnodes - qnodes_before,
+            'time': time.monotonic() - iteration_start,
+        })
+        state.can_abort = True
+        result.nodes = state.nodes
+        result.qnodes = state.qnodes
+        result.elapsed = state.elapsed()
+        result.stats = state.search_stats()
+        if on_iteration is not None:
+            on_iteration(result)
+        
+        # A forced move needs no deeper search, and a new iteration started
+        # after the soft limit would almost certainly not finish
+        if len(root_moves) == 1 or state.soft_limit_reached() or state.stop_requested():
+            break
     
+    result.nodes = state.nodes
+    result.qnodes = state.qnodes
+    result.elapsed = state.elapsed()
+    result.stats = state.search_stats()
+    return result
+
+def aspiration_search(board, depth, state, root_moves, previous=None, multipv=1):
+    """
+    Root search in a narrow window around the previous iteration's score,
+    widened and repeated whenever the score falls outside it. Multi-PV and
+    mate scores use the full window. Returns search_root's result.
+    """
+    alpha = beta = None
+    delta = ASPIRATION_WINDOW
+    if (previous is not None and multipv == 1 and depth >= ASPIRATION_MIN_DEPTH
+            and abs(previous) < MATE_BOUND):
+        alpha = previous - delta
+        beta = previous + delta
+    
+    while True:
+        score, best_move, scored = search_root(board, depth, state, root_moves, alpha, beta, multipv)
+        if alpha is not None and score <= alpha:
+            alpha = widen(score, -delta)
+        elif beta is not None and score >= beta:
+            beta = widen(score, delta)
+        else:
+            return score, best_move, scored
+        state.stats['aspiration_researches'] += 1
+        delta *= 2
+        # Keep the new order so a fail-high move is searched first
+        root_moves = [move for _, move in scored]
+
+def widen(score, delta):
+    """Next aspiration bound past score, or None (unbounded) once the window is wide"""
+    if abs(delta) > ASPIRATION_MAX_WINDOW:
+        return None
+    return score + delta
+
+def search_root(board, depth, state, root_moves, alpha=None, beta=None, multipv=1):
+    """
+    Search the root moves to the given depth (scores from the side to move's view)
+    inside the window (alpha, beta); None means unbounded.
+    With multipv=k the best k moves get exact scores: a move only has to beat
+    the k-th best score so far instead of the best.
+    Returns score, best move and the (score, move) pairs best first; their
+    order seeds the move ordering of the next iteration.
+    """
+    alpha = -float('inf') if alpha is None else alpha
+    beta = float('inf') if beta is None else beta
+    scored = []
     best_move = None
+    best_score = -float('inf')
+    state.count_node()
     
-    if maximizing_player:
-        max_eval = float('-inf')
-        for move in order_moves(board):
-            board.push(move)
-            eval_score, _ = minimax_search(board, depth - 1, alpha, beta, False)
-            board.pop()
-            
-            if eval_score > max_eval:
-                max_eval = eval_score
-                best_move = move
-            
-            alpha = max(alpha, eval_score)
-            if beta <= alpha:
-                break  # Alpha-beta cutoff
+    for index, move in enumerate(root_moves):
+        floor = alpha
+        if len(scored) >= multipv:
+            floor = max(alpha, sorted((score for score, _ in scored), reverse=True)[multipv - 1])
         
-        return max_eval, best_move
-    else:
-        min_eval = float('inf')
-        for move in order_moves(board):
-            board.push(move)
-            eval_score, _ = minimax_search(board, depth - 1, alpha, beta, True)
-            board.pop()
+        make_move(board, move, state)
+        nodes_before = state.nodes
+        try:
+            if index < multipv or not state.config.pvs:
+                score = -negamax(board, depth - 1, -beta, -floor, state, 1)
+            else:
+                score = -negamax(board, depth - 1, -floor - 1, -floor, state, 1)
+                if floor < score < beta:
+                    state.stats['pvs_researches'] += 1
+                    score = -negamax(board, depth - 1, -beta, -floor, state, 1)
+            if state.config.check_extensions and board.is_check():
+                state.stats['check_extension_nodes'] += state.nodes - nodes_before
+        finally:
+            unmake_move(board, state)
+        scored.append((score, move))
+        
+        if score > best_score:
+            best_score = score
+            best_move = move
+        if score >= beta:
+            break  # Fail high: the caller widens the window and searches again
+    
+    # Stable sort keeps the previous order among equal scores; unsearched moves go last
+    scored.sort(key=lambda item: item[0], reverse=True)
+    scored += [(-float('inf'), move) for move in root_moves[len(scored):]]
+    if state.tt is not None:
+        if best_score <= alpha:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        state.tt.store(chess.polyglot.zobrist_hash(board), depth, flag, best_score, best_move)
+    return best_score, best_move, scored
+
+def principal_variation(board, move, tt, max_length=MAX_DEPTH):
+    """The line starting with move, followed through the TT's best moves"""
+    pv = [move]
+    board.push(move)
+    seen = {chess.polyglot.zobrist_hash(board)}
+    while tt is not None and len(pv) < max_length:
+        entry = tt.probe(chess.polyglot.zobrist_hash(board))
+        if entry is None or entry.move is None or not board.is_legal(entry.move):
+            break
+        board.push(entry.move)
+        pv.append(entry.move)
+        key = chess.polyglot.zobrist_hash(board)
+        if key in seen:
+            break  # Repetition: the TT would lead round in circles
+        seen.add(key)
+    for _ in pv:
+        board.pop()
+    return pv
+
+def negamax(board, depth, alpha, beta, state, ply, allow_null=True):
+    """
+    Principal variation search in negamax form: scores are from the side
+    to move's view. The selective features are switched by state.config.
+    """
+    config = state.config
+    stats = state.stats
+    state.count_node()
+    pv_node = beta - alpha > 1
+    
+    # Draws by rule or repetition inside the tree
+    if board.halfmove_clock >= 100 or board.is_insufficient_material():
+        return 0
+    if board.halfmove_clock >= 4 and board.is_repetition(2):
+        return 0
+    
+    in_check = board.is_check()
+    if in_check and config.check_extensions:
+        depth += 1
+        stats['check_extensions'] += 1
+    
+    # Tablebase position: the WDL result is exact. Only probed right after a
+    # capture or pawn move, because WDL assumes a fresh 50-move counter
+    tablebase = state.tablebase
+    if tablebase is not None and board.halfmove_clock == 0 and tablebase.can_probe(board):
+        wdl = tablebase.probe_wdl(board)
+        if wdl is not None:
+            stats['tb_hits'] += 1
+            return tablebase_score(wdl, ply)
+    
+    if depth <= 0 or ply >= MAX_PLY:
+        return quiescence(board, alpha, beta, state)
+    
+    tt = state.tt
+    key = None
+    tt_move = None
+    if tt is not None:
+        key = chess.polyglot.zobrist_hash(board)
+        entry = tt.probe(key)
+        if entry is not None:
+            tt_move = entry.move
+            # With PVS, PV nodes are always searched so the principal variation stays intact
+            if (not pv_node or not config.pvs) and entry.depth >= depth:
+                if (entry.flag == EXACT
+                        or (entry.flag == LOWER and entry.score >= beta)
+                        or (entry.flag == UPPER and entry.score <= alpha)):
+                    stats['tt_cutoffs'] += 1
+                    return entry.score
+    
+    static = None
+    if not in_check and not pv_node:
+        static = side_eval(board, state)
+        
+        # Null move: if passing still fails high, a real move almost certainly will
+        if (config.null_move and allow_null and depth >= config.null_move_min_depth
+                and static >= beta and has_non_pawn_material(board)):
+            reduction = config.null_move_reduction + (1 if depth > 6 else 0)
+            stats['null_move_tries'] += 1
+            nodes_before = state.nodes
+            make_move(board, chess.Move.null(), state)
+            try:
+                score = -negamax(board, depth - 1 - reduction, -beta, -beta + 1, state, ply + 1, False)
+            finally:
+                unmake_move(board, state)
+            if score >= beta and depth >= config.null_move_verify_depth:
+                # Zugzwang guard: confirm with a reduced search that may not pass
+                score = negamax(board, depth - 1 - reduction, beta - 1, beta, state, ply, False)
+            stats['null_move_nodes'] += state.nodes - nodes_before
+            if score >= beta:
+                stats['null_move_cutoffs'] += 1
+                # Don't trust unproven mate scores from a null-move search
+                return beta if score >= MATE_BOUND else score
+    
+    # Without a TT move, let a PV node start with the statically best child
+    if (tt_move is None and pv_node and depth >= BATCH_ORDER_DEPTH
+            and state.batch_evaluator is not None):
+        ordered = state.batch_evaluator.order_moves(board, board.legal_moves)
+        if ordered:
+            tt_move = ordered[0]
+    
+    futile = False
+    if (config.futility_pruning and static is not None
+            and depth < len(config.futility_margins)
+            and static + config.futility_margins[depth] <= alpha):
+        futile = True
+    
+    alpha_orig = alpha
+    best_score = -float('inf')
+    best_move = None
+    moves_searched = 0
+    tables = state.ordering
+    picker = MovePicker(board, tt_move, tables, ply)
+    
+    for move in picker:
+        quiet = picker.stage in (STAGE_QUIETS, STAGE_BAD_CAPTURES) and not move.promotion
+        make_move(board, move, state)
+        try:
+            gives_check = board.is_check()
             
-            if eval_score < min_eval:
-                min_eval = eval_score
-                best_move = move
+            # Futility pruning: a quiet move can't bring this frontier node back to alpha
+            if futile and moves_searched > 0 and quiet and not gives_check:
+                stats['futility_prunes'] += 1
+                continue
             
-            beta = min(beta, eval_score)
-            if beta <= alpha:
-                break  # Alpha-beta cutoff
+            nodes_before = state.nodes
+            if moves_searched == 0 or not config.pvs:
+                score = -negamax(board, depth - 1, -beta, -alpha, state, ply + 1)
+            else:
+                reduction = 0
+                if (config.late_move_reductions and quiet and not in_check and not gives_check
+                        and depth >= config.lmr_min_depth and moves_searched >= config.lmr_min_moves):
+                    reduction = 1 if pv_node or moves_searched < 6 else 2
+                    reduction = min(reduction, depth - 2)
+                    stats['lmr_reductions'] += 1
+                
+                score = -negamax(board, depth - 1 - reduction, -alpha - 1, -alpha, state, ply + 1)
+                if reduction:
+                    stats['lmr_nodes'] += state.nodes - nodes_before
+                if reduction and score > alpha:
+                    stats['lmr_researches'] += 1
+                    score = -negamax(board, depth - 1, -alpha - 1, -alpha, state, ply + 1)
+                if pv_node and alpha < score < beta:
+                    stats['pvs_researches'] += 1
+                    score = -negamax(board, depth - 1, -beta, -alpha, state, ply + 1)
+            
+            # The child extends itself when in check; futile nodes only keep their loud moves
+            if gives_check and config.check_extensions:
+                stats['check_extension_nodes'] += state.nodes - nodes_before
+            if futile:
+                stats['futility_nodes'] += state.nodes - nodes_before
+        finally:
+            unmake_move(board, state)
+        moves_searched += 1
         
-        return min_eval, best_move
+        if score > best_score:
+            best_score = score
+            best_move = move
+        if score > alpha:
+            alpha = score
+        if alpha >= beta:
+            record_cutoff(board, move, depth, tables, ply)
+            break
+    
+    if moves_searched == 0:
+        # The first move is never pruned, so no move means checkmate or stalemate
+        return mated_score(board) if in_check else 0
+    
+    if tt is not None:
+        if best_score <= alpha_orig:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        tt.store(key, depth, flag, best_score, best_move)
+    
+    return best_score
+
+def minimax_search(board, depth, alpha, beta, maximizing_player, state=None):
+    """
+    Alpha-beta search with White-view scores, kept for callers of the
+    original minimax interface; maximizing_player is True when White is to
+    move. Returns (score, best move).
+    """
+    if state is None:
+        state = SearchState()
+        state.begin(board)
+    sign = 1 if maximizing_player else -1
+    if board.is_game_over():
+        return terminal_score(board), None
+    # The White-view window (alpha, beta) from the side to move's view
+    low, high = (alpha, beta) if maximizing_player else (-beta, -alpha)
+    if depth <= 0:
+        return sign * quiescence(board, low, high, state), None
+    
+    best_move = None
+    best_score = -float('inf')
+    for move in order_moves(board):
+        make_move(board, move, state)
+        try:
+            score = -negamax(board, depth - 1, -high, -low, state, 1)
+        finally:
+            unmake_move(board, state)
+        if score > best_score:
+            best_score = score
+            best_move = move
+        low = max(low, score)
+        if low >= high:
+            break
+    return sign * best_score, best_move
+
+def has_non_pawn_material(board):
+    """Whether the side to move has a piece other than king and pawns (null-move zugzwang guard)"""
+    own = board.occupied_co[board.turn]
+    return bool(own & (board.knights | board.bishops | board.rooks | board.queens))
+
+def make_move(board, move, state):
+    """Push move, keeping the incremental evaluator in step"""
+    if state is not None and state.evaluator is not None:
+        state.evaluator.push(board, move)
+    else:
+        board.push(move)
+
+def unmake_move(board, state):
+    if state is not None and state.evaluator is not None:
+        state.evaluator.pop(board)
+    else:
+        board.pop()
+
+def static_eval(board, state):
+    """Evaluation of a leaf from White's view"""
+    if state is not None and state.evaluator is not None:
+        return state.evaluator.evaluate(board)
+    return evaluate_position(board)
+
+def side_eval(board, state):
+    """Evaluation of a leaf from the side to move's view"""
+    score = static_eval(board, state)
+    return score if board.turn == chess.WHITE else -score
+
+def record_cutoff(board, move, depth, tables, ply):
+    """Teach the killer and history tables about a quiet move that failed high"""
+    if tables is None or move.promotion or board.is_capture(move):
+        return
+    tables.add_killer(ply, move)
+    tables.add_history(board.turn, move, depth)
 
-def order_moves(board):
-    """Order moves for better alpha-beta pruning efficiency"""
-    moves = list(board.legal_moves)
+def mated_score(board):
+    """Score for the side to move being checkmated; later mates are less bad"""
+    return -(MATE_SCORE - board.ply())
+
+def terminal_score(board):
+    """Score of a finished game from White's view"""
+    if board.is_checkmate():
+        mate = -mated_score(board)
+        return -mate if board.turn == chess.WHITE else mate
+    return 0
+
+def quiescence(board, alpha, beta, state, qdepth=0):
+    """
+    Search captures and promotions only, until the position is quiet, so
+    leaf scores don't depend on an exchange being cut off half way.
+    Scores are from the side to move's view. Quiet checks are included at
+    the first ply when state.config.qsearch_checks is set.
+    """
+    state.count_node()
+    state.qnodes += 1
     
-    # Separate move types for better ordering
-    captures = []
-    checks = []
-    other_moves = []
+    in_check = board.is_check()
+    if in_check:
+        # No stand-pat when in check: every evasion has to be tried
+        moves = list(board.legal_moves)
+        if not moves:
+            return mated_score(board)
+        stand_pat = -float('inf')
+    else:
+        stand_pat = side_eval(board, state)
+        if stand_pat >= beta:
+            return stand_pat
+        alpha = max(alpha, stand_pat)
+        moves = order_captures(board)
+        if qdepth == 0 and state.config.qsearch_checks:
+            moves += [move for move in board.legal_moves
+                      if not board.is_capture(move) and not move.promotion and board.gives_check(move)]
     
+    best_score = stand_pat
     for move in moves:
-        if board.is_capture(move):
-            captures.append(move)
-        elif board.gives_check(move):
-            checks.append(move)
-        else:
-            other_moves.append(move)
+        if not in_check:
+            # Delta pruning: even winning this material can't reach alpha
+            if stand_pat + capture_gain(board, move) + DELTA_MARGIN <= alpha:
+                continue
+            # Don't look at captures that lose material in the exchange
+            if board.is_capture(move) and static_exchange_eval(board, move) < 0:
+                continue
+        
+        make_move(board, move, state)
+        try:
+            score = -quiescence(board, -beta, -alpha, state, qdepth + 1)
+        finally:
+            unmake_move(board, state)
+        
+        if score > best_score:
+            best_score = score
+        if score > alpha:
+            alpha = score
+        if alpha >= beta:
+            break
     
-    # Return in order: captures first, then checks, then other moves
-    return captures + checks + other_moves
+    return best_score
+
+def order_captures(board):
+    """Captures and promotions, most valuable victim / least valuable attacker first"""
+    moves = list(board.generate_legal_captures())
+    moves += [move for move in board.generate_legal_moves(to_mask=chess.BB_ALL & ~board.occupied)
+              if move.promotion]
+    moves.sort(key=lambda move: mvv_lva(board, move), reverse=True)
+    return moves
+
+def order_moves(board, tt_move=None):
+    """Order moves for better alpha-beta pruning efficiency (TT move, captures, quiets)"""
+    return list(pick_moves(board, tt_move))
@@ -0,0 +1,132 @@
+from collections import OrderedDict
+import chess
+import chess.polyglot
+import chess.syzygy
+
+# Score of a tablebase win; below the mate scores so a real mate is preferred
+TB_WIN_SCORE = 90000
+
+class Tablebase:
+    """
+    Syzygy endgame tablebases from a local directory. WDL results are kept
+    in an LRU cache keyed by Zobrist hash, since the search keeps reaching
+    the same endgame positions; DTZ is only probed at the root.
+    """
+    
+    def __init__(self, path, max_pieces=None, cache_size=100000):
+        self.path = path
+        self.tablebase = chess.syzygy.open_tablebase(path)
+        # Largest table found, e.g. 'KRPvKR' -> 5 pieces
+        available = max((len(name) - 1 for name in self.tablebase.wdl), default=0)
+        self.max_pieces = min(max_pieces, available) if max_pieces else available
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.reset_stats()
+    
+    def reset_stats(self):
+        self.wdl_probes = 0
+        self.wdl_hits = 0
+        self.cache_hits = 0
+        self.dtz_probes = 0
+        self.dtz_hits = 0
+        self.missing = 0
+    
+    def can_probe(self, board):
+        """Few enough pieces and no castling rights (the tables don't cover castling)"""
+        return (chess.popcount(board.occupied) <= self.max_pieces
+                and not board.castling_rights)
+    
+    def probe_wdl(self, board):
+        """
+        Win/draw/loss for the side to move: 2 win, 1 cursed win, 0 draw,
+        -1 blessed loss, -2 loss; None when the table is missing.
+        """
+        key = chess.polyglot.zobrist_hash(board)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.cache_hits += 1
+            return self.cache[key]
+        
+        self.wdl_probes += 1
+        try:
+            wdl = self.tablebase.probe_wdl(board)
+        except KeyError:  # MissingTableError
+            self.missing += 1
+            wdl = None
+        else:
+            self.wdl_hits += 1
+        
+        self.cache[key] = wdl
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return wdl
+    
+    def probe_dtz(self, board):
+        """Distance to the next capture or pawn move (signed like WDL), or None"""
+        self.dtz_probes += 1
+        try:
+            dtz = self.tablebase.probe_dtz(board)
+        except KeyError:
+            self.missing += 1
+            return None
+        self.dtz_hits += 1
+        return dtz
+    
+    def root_moves(self, board):
+        """
+        Legal moves ranked by the tablebase, best first, as (move, wdl, dtz)
+        from the mover's view: the fastest win, else a draw, else the
+        slowest loss. None if the position or a child can't be probed.
+        """
+        if not self.can_probe(board):
+            return None
+        ranked = []
+        for move in board.legal_moves:
+            zeroing = board.is_zeroing(move)
+            board.push(move)
+            try:
+                if board.is_checkmate():
+                    wdl, dtz = 2, 0
+                else:
+                    child_wdl = self.probe_wdl(board)
+                    child_dtz = self.probe_dtz(board)
+                    if child_wdl is None or child_dtz is None:
+                        return None
+                    wdl = -child_wdl
+                    # A capture or pawn move resets the counter: progress at once
+                    dtz = 1 if zeroing else abs(child_dtz) + 1
+                    if wdl == 0:
+                        dtz = 0
+                    elif wdl < 0:
+                        dtz = -dtz
+            finally:
+                board.pop()
+            ranked.append((move, wdl, dtz))
+        
+        # Best WDL first; wins with the shortest distance, losses with the longest
+        ranked.sort(key=lambda item: (item[1], -item[2]), reverse=True)
+        return ranked
+    
+    def stats(self):
+        return {
+            'max_pieces': self.max_pieces,
+            'wdl_probes': self.wdl_probes,
+            'wdl_hits': self.wdl_hits,
+            'cache_hits': self.cache_hits,
+            'dtz_probes': self.dtz_probes,
+            'dtz_hits': self.dtz_hits,
+            'missing': self.missing,
+            'cache_entries': len(self.cache),
+        }
+    
+    def close(self):
+        self.tablebase.close()
+
+def tablebase_score(wdl, ply):
+    """Search score for a WDL result; wins found nearer the root score higher"""
+    if wdl > 1:
+        return TB_WIN_SCORE - ply
+    if wdl < -1:
+        return -TB_WIN_SCORE + ply
+    # Cursed wins and blessed losses are draws under the 50-move rule
+    return 0
@@ -0,0 +1,70 @@
+class TimeBudget:
+    """Search budget for one move, in seconds"""
+    
+    def __init__(self, soft, hard, max_depth=None, emergency=False):
+        # Don't start a new iteration after soft; abort the search at hard
+        self.soft = soft
+        self.hard = hard
+        self.max_depth = max_depth
+        self.emergency = emergency
+    
+    def __repr__(self):
+        return (f"TimeBudget(soft={self.soft:.3f}, hard={self.hard:.3f}, "
+                f"max_depth={self.max_depth}, emergency={self.emergency})")
+
+class TimeManager:
+    """Turns the remaining clock into per-move soft and hard search budgets"""
+    
+    def __init__(self, move_overhead=0.15, emergency_time=5.0, emergency_depth=2,
+                 min_moves_to_go=20, max_moves_to_go=45, min_time=0.02):
+        # Time lost per move to network round trips and board bookkeeping
+        self.move_overhead = move_overhead
+        # Below this much remaining time only a shallow search is allowed
+        self.emergency_time = emergency_time
+        self.emergency_depth = emergency_depth
+        self.min_moves_to_go = min_moves_to_go
+        self.max_moves_to_go = max_moves_to_go
+        self.min_time = min_time
+    
+    def moves_to_go(self, board):
+        """Estimate how many more moves we have to make on this clock"""
+        remaining = self.max_moves_to_go - board.fullmove_number // 2
+        return max(self.min_moves_to_go, remaining)
+    
+    def allocate(self, board, time_left, increment=0.0, volatility=0.0):
+        """
+        Return a TimeBudget for the side to move.
+        time_left and increment are in seconds; volatility is in [0, 1] and
+        stretches the budget in sharp or unstable positions.
+        """
+        usable = max(0.0, time_left - self.move_overhead)
+        
+        # Low on time: play fast and shallow rather than flag
+        if time_left <= self.emergency_time:
+            hard = max(self.min_time, min(usable / 10, increment * 0.5 + usable / 30))
+            return TimeBudget(hard * 0.5, hard, self.emergency_depth, emergency=True)
+        
+        base = usable / self.moves_to_go(board) + increment * 0.75
+        soft = base * (1.0 + volatility)
+        hard = min(soft * 3.0, usable * 0.25)
+        soft = min(soft, hard)
+        return TimeBudget(max(self.min_time, soft), max(self.min_time, hard))
+
+def position_volatility(board, last_search=None):
+    """
+    Rough measure in [0, 1] of how sharp the position is: checks, pending
+    captures and how often the best move changed during the previous search.
+    """
+    volatility = 0.0
+    if board.is_check():
+        volatility += 0.3
+    
+    captures = sum(1 for _ in board.generate_legal_captures())
+    volatility += min(0.3, captures * 0.05)
+    
+    if last_search is not None and len(last_search.iterations) > 1:
+        moves = [iteration['move'] for iteration in last_search.iterations]
+        changes = sum(1 for previous, current in zip(moves, moves[1:]) if previous != current)
+        volatility += min(0.4, changes * 0.2)
+    
+    return min(1.0, volatility)
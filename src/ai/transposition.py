@@ -0,0 +1,235 @@
+from collections import namedtuple
+from multiprocessing import shared_memory
+import chess
+
+# Bound types stored with each entry
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Rough size of one stored entry (tuple + boxed ints + move object) in CPython
+ENTRY_SIZE = 128
+
+TTEntry = namedtuple('TTEntry', ['key', 'depth', 'flag', 'score', 'move', 'age'])
+
+
+class TranspositionTable:
+    """
+    Fixed-size hash table of search results keyed by Zobrist hash.
+    
+    Replacement policy (one entry per slot):
+      - an empty slot or a slot holding the same position is always written
+      - an entry left over from an earlier search (older age) is always replaced
+      - otherwise the new entry only replaces one of equal or lower depth
+    """
+    
+    def __init__(self, size_mb=16):
+        self.size_mb = size_mb
+        self.size = self._size_for(size_mb)
+        self.mask = self.size - 1
+        self.table = [None] * self.size
+        self.age = 0
+        self.reset_stats()
+    
+    @staticmethod
+    def _size_for(size_mb, entry_size=ENTRY_SIZE):
+        """Largest power of two number of entries that fits in the budget"""
+        entries = max(1, int(size_mb * 1024 * 1024) // entry_size)
+        return 1 << (entries.bit_length() - 1)
+    
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+        self.overwrites = 0
+    
+    def resize(self, size_mb):
+        """Change the memory budget, dropping all stored entries"""
+        self.size_mb = size_mb
+        self.size = self._size_for(size_mb)
+        self.mask = self.size - 1
+        self.clear()
+    
+    def clear(self):
+        """Forget every stored position (e.g. at the start of a new game)"""
+        self.table = [None] * self.size
+        self.age = 0
+        self.reset_stats()
+    
+    def new_search(self):
+        """Mark entries from previous searches as replaceable"""
+        self.age = (self.age + 1) & 0xFF
+    
+    def probe(self, key):
+        """Return the entry stored for key, or None"""
+        entry = self.table[key & self.mask]
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.key != key:
+            self.collisions += 1
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+    
+    def store(self, key, depth, flag, score, move):
+        """Store a search result, subject to the replacement policy"""
+        index = key & self.mask
+        old = self.table[index]
+        if old is not None and old.key != key:
+            if old.age == self.age and depth < old.depth:
+                return
+            self.overwrites += 1
+        elif old is not None and move is None:
+            # Keep the previously known best move for this position
+            move = old.move
+        self.table[index] = TTEntry(key, depth, flag, score, move, self.age)
+        self.stores += 1
+    
+    def hashfull(self):
+        """Permille of sampled slots that hold an entry from the current search"""
+        sample = min(self.size, 1000)
+        used = sum(1 for entry in self.table[:sample]
+                   if entry is not None and entry.age == self.age)
+        return used * 1000 // sample
+    
+    def stats(self):
+        """Counters for diagnostics"""
+        probes = self.hits + self.misses
+        return {
+            'size': self.size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'collisions': self.collisions,
+            'stores': self.stores,
+            'overwrites': self.overwrites,
+            'hit_rate': self.hits / probes if probes else 0.0,
+        }
+
+# Packed layout of the data word of a shared entry
+SCORE_BITS = 24
+SCORE_OFFSET = 1 << (SCORE_BITS - 1)
+DEPTH_SHIFT = SCORE_BITS
+FLAG_SHIFT = DEPTH_SHIFT + 8
+AGE_SHIFT = FLAG_SHIFT + 2
+MOVE_SHIFT = AGE_SHIFT + 8
+
+# Header words before the first entry: current age, number of entries
+HEADER_WORDS = 2
+
+def encode_move(move):
+    """Pack a move into 15 bits (0 means no move)"""
+    if move is None:
+        return 0
+    return move.from_square | (move.to_square << 6) | ((move.promotion or 0) << 12)
+
+def decode_move(packed):
+    if not packed:
+        return None
+    promotion = packed >> 12
+    return chess.Move(packed & 63, (packed >> 6) & 63, promotion or None)
+
+class SharedTranspositionTable(TranspositionTable):
+    """
+    Transposition table in a multiprocessing.shared_memory block so several
+    search processes can share results without locks. Each entry is two
+    64-bit words, (key ^ data, data); a torn write from a concurrent store
+    fails the XOR check on probe and reads as a miss.
+    Same interface and replacement policy as TranspositionTable.
+    """
+    
+    def __init__(self, size_mb=16, name=None):
+        self.owner = name is None
+        if self.owner:
+            self.size = self._size_for(size_mb, entry_size=16)
+            nbytes = (HEADER_WORDS + 2 * self.size) * 8
+            self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            self.words = self.shm.buf.cast('Q')
+            self.words[1] = self.size
+        else:
+            # Worker processes share the creator's resource tracker, so attaching
+            # here doesn't make the block disappear when a worker exits
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.words = self.shm.buf.cast('Q')
+            self.size = self.words[1]
+        self.size_mb = size_mb
+        self.mask = self.size - 1
+        self.name = self.shm.name
+        self.reset_stats()
+    
+    @property
+    def age(self):
+        return self.words[0]
+    
+    def new_search(self):
+        self.words[0] = (self.words[0] + 1) & 0xFF
+    
+    def resize(self, size_mb):
+        raise ValueError("A shared transposition table can't be resized; create a new one")
+    
+    def clear(self):
+        start = HEADER_WORDS * 8
+        self.shm.buf[start:] = bytes(len(self.shm.buf) - start)
+        self.words[0] = 0
+        self.reset_stats()
+    
+    def probe(self, key):
+        index = HEADER_WORDS + 2 * (key & self.mask)
+        data = self.words[index + 1]
+        if data == 0:
+            self.misses += 1
+            return None
+        if self.words[index] ^ data != key:
+            self.collisions += 1
+            self.misses += 1
+            return None
+        self.hits += 1
+        return TTEntry(
+            key,
+            (data >> DEPTH_SHIFT) & 0xFF,
+            (data >> FLAG_SHIFT) & 3,
+            (data & ((1 << SCORE_BITS) - 1)) - SCORE_OFFSET,
+            decode_move(data >> MOVE_SHIFT),
+            (data >> AGE_SHIFT) & 0xFF)
+    
+    def store(self, key, depth, flag, score, move):
+        index = HEADER_WORDS + 2 * (key & self.mask)
+        old_data = self.words[index + 1]
+        age = self.words[0]
+        if old_data:
+            same_key = self.words[index] ^ old_data == key
+            if not same_key:
+                old_age = (old_data >> AGE_SHIFT) & 0xFF
+                if old_age == age and depth < (old_data >> DEPTH_SHIFT) & 0xFF:
+                    return
+                self.overwrites += 1
+            elif move is None:
+                move = decode_move(old_data >> MOVE_SHIFT)
+        score = max(-SCORE_OFFSET, min(SCORE_OFFSET - 1, int(score)))
+        data = ((score + SCORE_OFFSET)
+                | (min(depth, 0xFF) << DEPTH_SHIFT)
+                | (flag << FLAG_SHIFT)
+                | (age << AGE_SHIFT)
+                | (encode_move(move) << MOVE_SHIFT))
+        self.words[index] = key ^ data
+        self.words[index + 1] = data
+        self.stores += 1
+    
+    def hashfull(self):
+        sample = min(self.size, 1000)
+        age = self.words[0]
+        used = 0
+        for slot in range(sample):
+            data = self.words[HEADER_WORDS + 2 * slot + 1]
+            if data and (data >> AGE_SHIFT) & 0xFF == age:
+                used += 1
+        return used * 1000 // sample
+    
+    def close(self):
+        """Detach from the block; the creating process also frees it"""
+        self.words.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
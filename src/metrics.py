@@ -0,0 +1,172 @@
+import threading
+from .net.http_client import LatencyHistogram
+
+# Search time per move is measured in whole seconds, not API round trips
+SEARCH_BUCKETS_MS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, float('inf'))
+
+# name -> (Prometheus type, help text)
+METRIC_HELP = {
+    'chessbot_moves_total': ('counter', 'Moves chosen, by source (search, book, tablebase)'),
+    'chessbot_search_nodes_total': ('counter', 'Nodes searched, quiescence included'),
+    'chessbot_search_qnodes_total': ('counter', 'Quiescence nodes searched'),
+    'chessbot_search_depth_total': ('counter', 'Sum of the depths reached by searches'),
+    'chessbot_search_depth': ('gauge', 'Depth reached by the last search'),
+    'chessbot_search_nps': ('gauge', 'Nodes per second of the last search'),
+    'chessbot_search_nps_average': ('gauge', 'Nodes per second over all searches'),
+    'chessbot_search_qsearch_ratio': ('gauge', 'Share of all nodes spent in quiescence'),
+    'chessbot_tt_probes_total': ('counter', 'Transposition table probes'),
+    'chessbot_tt_hits_total': ('counter', 'Transposition table probes that found the position'),
+    'chessbot_tt_hit_ratio': ('gauge', 'Transposition table hit rate over all searches'),
+    'chessbot_search_seconds': ('histogram', 'Search time per move'),
+    'lichess_stream_connects_total': ('counter', 'Streams opened, by stream (event, game)'),
+    'lichess_stream_drops_total': ('counter', 'Streams that ended with an error, by stream'),
+    'lichess_games_in_flight': ('gauge', 'Games being played'),
+    'lichess_search_queue_depth': ('gauge', 'Searches waiting for a scheduler worker'),
+    'lichess_api_retries_total': ('counter', 'Lichess API requests retried'),
+    'lichess_api_request_seconds': ('histogram', 'Lichess API round trip by endpoint; move is the move submit'),
+}
+
+class Metrics:
+    """
+    Process-wide counters, gauges and histograms rendered in the Prometheus
+    text format. Everything is updated once per move or per stream, never
+    per node, so the search itself pays nothing for it.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        # (name, labels) -> value; labels is a sorted tuple of (key, value)
+        self.values = {}
+        self.histograms = {}
+    
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + value
+    
+    def set(self, name, value, **labels):
+        with self.lock:
+            self.values[(name, tuple(sorted(labels.items())))] = value
+    
+    def get(self, name, **labels):
+        with self.lock:
+            return self.values.get((name, tuple(sorted(labels.items()))), 0)
+    
+    def histogram(self, name, buckets=SEARCH_BUCKETS_MS):
+        with self.lock:
+            if name not in self.histograms:
+                self.histograms[name] = LatencyHistogram(buckets)
+            return self.histograms[name]
+    
+    def record_search(self, sample):
+        """Count one move decision; sample comes from search_sample()"""
+        self.inc('chessbot_moves_total', source=sample['source'])
+        if sample['source'] != 'search':
+            return
+        self.inc('chessbot_search_nodes_total', sample['nodes'])
+        self.inc('chessbot_search_qnodes_total', sample['qnodes'])
+        self.inc('chessbot_search_depth_total', sample['depth'])
+        self.inc('chessbot_tt_probes_total', sample['tt_probes'])
+        self.inc('chessbot_tt_hits_total', sample['tt_hits'])
+        self.set('chessbot_search_depth', sample['depth'])
+        if sample['elapsed'] > 0:
+            self.set('chessbot_search_nps', sample['nodes'] / sample['elapsed'])
+        self.histogram('chessbot_search_seconds').observe(sample['elapsed'])
+    
+    def derived(self):
+        """Ratios worth a glance that Prometheus could also compute itself"""
+        nodes = self.get('chessbot_search_nodes_total')
+        probes = self.get('chessbot_tt_probes_total')
+        seconds = self.histogram('chessbot_search_seconds').snapshot()
+        total_seconds = seconds['mean_ms'] * seconds['count'] / 1000
+        return {
+            'chessbot_search_nps_average': nodes / total_seconds if total_seconds else 0.0,
+            'chessbot_search_qsearch_ratio': (self.get('chessbot_search_qnodes_total') / nodes
+                                              if nodes else 0.0),
+            'chessbot_tt_hit_ratio': (self.get('chessbot_tt_hits_total') / probes
+                                      if probes else 0.0),
+        }
+    
+    def render(self, manager=None):
+        """
+        All metrics in the Prometheus text exposition format. manager (a
+        LichessBotManager or AsyncLichessBot) adds the per-client figures:
+        games in flight, scheduler queue and API latency.
+        """
+        with self.lock:
+            values = dict(self.values)
+            histograms = dict(self.histograms)
+        for name, value in self.derived().items():
+            values[(name, ())] = value
+        histogram_series = {name: [((), histogram.snapshot())] for name, histogram in histograms.items()}
+        
+        if manager is not None:
+            values[('lichess_games_in_flight', ())] = len(manager.active_games)
+            scheduler = getattr(manager, 'scheduler', None)
+            if scheduler is not None:
+                values[('lichess_search_queue_depth', ())] = scheduler.stats()['queue_depth']
+            values[('lichess_api_retries_total', ())] = manager.http.retries
+            histogram_series['lichess_api_request_seconds'] = [
+                ((('endpoint', endpoint),), snapshot)
+                for endpoint, snapshot in sorted(manager.http.latency_stats().items())]
+        
+        lines = []
+        for name, (kind, help_text) in METRIC_HELP.items():
+            if kind == 'histogram':
+                series = histogram_series.get(name)
+            else:
+                series = sorted((labels, value) for (key, labels), value in values.items() if key == name)
+            if not series:
+                continue
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in series:
+                if kind == 'histogram':
+                    lines.extend(histogram_lines(name, labels, value))
+                else:
+                    lines.append(f'{name}{format_labels(labels)} {format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def histogram_lines(name, labels, snapshot):
+    """Cumulative buckets in seconds, from a LatencyHistogram snapshot (milliseconds)"""
+    lines = []
+    cumulative = 0
+    for bound, count in snapshot['buckets'].items():
+        cumulative += count
+        le = format_value(float(bound) / 1000)
+        lines.append(f'{name}_bucket{format_labels(labels + (("le", le),))} {cumulative}')
+    total = snapshot['mean_ms'] * snapshot['count'] / 1000
+    lines.append(f'{name}_sum{format_labels(labels)} {format_value(total)}')
+    lines.append(f'{name}_count{format_labels(labels)} {snapshot["count"]}')
+    return lines
+
+def search_sample(result):
+    """The figures of one SearchResult that Metrics.record_search counts"""
+    stats = result.stats if result is not None else {}
+    if stats.get('book'):
+        source = 'book'
+    elif stats.get('tablebase'):
+        source = 'tablebase'
+    else:
+        source = 'search'
+    return {
+        'source': source,
+        'nodes': result.nodes if result is not None else 0,
+        'qnodes': result.qnodes if result is not None else 0,
+        'depth': result.depth if result is not None else 0,
+        'elapsed': result.elapsed if result is not None else 0.0,
+        'tt_probes': stats.get('tt_probes', 0),
+        'tt_hits': stats.get('tt_hits', 0),
+    }
+
+METRICS = Metrics()
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import random
+import time
+import aiohttp
+from .http_client import IDEMPOTENT_METHODS, RETRY_STATUSES, LatencyHistogram, capped_delay, retry_delay
+
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10.0
+
+class AsyncLichessHTTP:
+    """
+    asyncio counterpart of LichessHTTP: one aiohttp session with a bounded
+    connection pool shared by the event stream, every game stream and all
+    API calls. Retries, backoff and latency histograms work the same way.
+    """
+    
+    def __init__(self, token, pool_size=32, max_retries=3, backoff=0.25, max_backoff=8.0):
+        self.token = token
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.session = None
+        self.histograms = {}
+        self.retries = 0
+        self.rng = random.Random()
+    
+    async def start(self):
+        connector = aiohttp.TCPConnector(limit=self.pool_size)
+        self.session = aiohttp.ClientSession(
+            headers={'Authorization': f'Bearer {self.token}'},
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=CONNECT_TIMEOUT, sock_read=READ_TIMEOUT)
+        )
+        return self
+    
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+    
+    async def __aenter__(self):
+        return await self.start()
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    
+    def histogram(self, endpoint):
+        if endpoint not in self.histograms:
+            self.histograms[endpoint] = LatencyHistogram()
+        return self.histograms[endpoint]
+    
+    async def request(self, endpoint, method, url, deadline=None, **kwargs):
+        """
+        Send a request and return (status, body text), retrying 429/5xx
+        responses and connection errors with jittered backoff. As with
+        LichessHTTP, non-idempotent requests are only retried on 429 or a
+        failed connect, and deadline (time.monotonic()) caps the backoff.
+        """
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        histogram = self.histogram(endpoint)
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            status = None
+            retry_after = ''
+            try:
+                async with self.session.request(method, url, **kwargs) as response:
+                    body = await response.text()
+                    status = response.status
+                    retry_after = response.headers.get('Retry-After', '')
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                histogram.observe(time.perf_counter() - start)
+                if attempt >= self.max_retries or not (idempotent or isinstance(e, aiohttp.ClientConnectorError)):
+                    raise
+                delay = capped_delay(retry_delay(attempt, self.backoff, self.max_backoff, self.rng), deadline)
+                if delay is None:
+                    raise
+            else:
+                histogram.observe(time.perf_counter() - start)
+                if (status not in RETRY_STATUSES or attempt >= self.max_retries
+                        or not (idempotent or status == 429)):
+                    return status, body
+                delay = capped_delay(retry_delay(attempt, self.backoff, self.max_backoff, self.rng,
+                                                 status, retry_after), deadline)
+                if delay is None:
+                    return status, body
+            
+            print(f"🔁 {endpoint}: retrying in {delay:.2f}s ({status or 'connection error'})")
+            self.retries += 1
+            await asyncio.sleep(delay)
+            attempt += 1
+    
+    async def get(self, endpoint, url, **kwargs):
+        return await self.request(endpoint, 'GET', url, **kwargs)
+    
+    async def post(self, endpoint, url, **kwargs):
+        return await self.request(endpoint, 'POST', url, **kwargs)
+    
+    async def get_json(self, endpoint, url):
+        status, body = await self.get(endpoint, url)
+        return json.loads(body) if status == 200 else None
+    
+    async def stream(self, endpoint, url, method='GET', **kwargs):
+        """
+        Async generator over the JSON events of an ndjson stream. Keep-alive
+        blank lines are skipped; the stream has no read timeout. Raises
+        aiohttp.ClientResponseError when the stream can't be opened.
+        """
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=CONNECT_TIMEOUT, sock_read=None)
+        start = time.perf_counter()
+        async with self.session.request(method, url, timeout=timeout, **kwargs) as response:
+            # Time to the response headers
+            self.histogram(endpoint).observe(time.perf_counter() - start)
+            response.raise_for_status()
+            async for line in response.content:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+    
+    def latency_stats(self):
+        return {endpoint: histogram.snapshot() for endpoint, histogram in self.histograms.items()}
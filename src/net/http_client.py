@@ -0,0 +1,184 @@
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+# (connect, read) timeouts in seconds for ordinary API calls
+DEFAULT_TIMEOUT = (3.05, 10.0)
+# Streams and seeks stay open until something happens, so they have no read timeout
+STREAM_TIMEOUT = (3.05, None)
+
+# Responses worth retrying: rate limiting and server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Methods safe to send twice. Anything else (a move submit) may already have
+# been applied when a 5xx or read timeout comes back, so it is only retried
+# when it never reached the server or was turned away by the rate limit
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+# Lichess asks clients to wait a full minute after a 429
+RATE_LIMIT_WAIT = 60.0
+
+# Histogram bucket upper bounds in milliseconds
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf'))
+
+class LatencyHistogram:
+    """Bucketed latency histogram for one endpoint, safe to update from any thread"""
+    
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.lock = threading.Lock()
+    
+    def observe(self, seconds):
+        ms = seconds * 1000
+        with self.lock:
+            for index, bound in enumerate(self.buckets):
+                if ms <= bound:
+                    self.counts[index] += 1
+                    break
+            self.count += 1
+            self.total += ms
+            self.max = max(self.max, ms)
+    
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of observations"""
+        with self.lock:
+            target = fraction * self.count
+            seen = 0
+            for bound, count in zip(self.buckets, self.counts):
+                seen += count
+                if count and seen >= target:
+                    return bound
+        return 0.0
+    
+    def snapshot(self):
+        with self.lock:
+            return {
+                'count': self.count,
+                'mean_ms': self.total / self.count if self.count else 0.0,
+                'max_ms': self.max,
+                'buckets': {str(bound): count for bound, count in zip(self.buckets, self.counts)},
+            }
+
+def retry_delay(attempt, backoff, max_backoff, rng, status=None, retry_after=''):
+    """Seconds to wait before retry number attempt (0-based) of a failed request"""
+    if status == 429:
+        return float(retry_after) if retry_after.isdigit() else RATE_LIMIT_WAIT
+    delay = min(max_backoff, backoff * 2 ** attempt)
+    # Full jitter so concurrent games don't retry in lockstep
+    return rng.uniform(0, delay)
+
+def capped_delay(delay, deadline):
+    """delay cut to the time left before deadline (time.monotonic()); None once it has passed"""
+    if deadline is None:
+        return delay
+    left = deadline - time.monotonic()
+    return min(delay, left) if left > 0 else None
+
+def never_sent(error):
+    """Whether a failed request certainly never reached the server (refused or connect timeout)"""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+class LichessHTTP:
+    """
+    Shared keep-alive session for the Lichess API. Connections are pooled
+    per host so a move submit reuses an open TLS connection; 429 and 5xx
+    responses and connection errors are retried with jittered exponential
+    backoff, non-idempotent requests only on 429 or a refused connection.
+    Every request's round trip is recorded in a histogram under its
+    endpoint name.
+    """
+    
+    def __init__(self, token, pool_size=16, max_retries=3, backoff=0.25, max_backoff=8.0,
+                 timeout=DEFAULT_TIMEOUT):
+        self.session = requests.Session()
+        self.session.headers['Authorization'] = f'Bearer {token}'
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.histograms = {}
+        self.retries = 0
+        self.lock = threading.Lock()
+        self.rng = random.Random()
+    
+    def histogram(self, endpoint):
+        with self.lock:
+            if endpoint not in self.histograms:
+                self.histograms[endpoint] = LatencyHistogram()
+            return self.histograms[endpoint]
+    
+    def backoff_delay(self, attempt, response=None):
+        """Seconds to wait before retry number attempt (0-based)"""
+        if response is None:
+            return retry_delay(attempt, self.backoff, self.max_backoff, self.rng)
+        return retry_delay(attempt, self.backoff, self.max_backoff, self.rng,
+                           response.status_code, response.headers.get('Retry-After', ''))
+    
+    def request(self, endpoint, method, url, stream=False, timeout=None, deadline=None, **kwargs):
+        """
+        Send a request and return the final response; raises the last
+        requests exception when every attempt failed to connect.
+        deadline (time.monotonic()) caps the backoff, e.g. at the flag for a
+        move submit; no retry is started after it.
+        """
+        if timeout is None:
+            timeout = STREAM_TIMEOUT if stream else self.timeout
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        histogram = self.histogram(endpoint)
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, stream=stream, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                histogram.observe(time.perf_counter() - start)
+                if attempt >= self.max_retries or not (idempotent or never_sent(e)):
+                    raise
+                response = None
+                delay = capped_delay(self.backoff_delay(attempt), deadline)
+                if delay is None:
+                    raise
+            else:
+                # For streams this is the time to the response headers
+                histogram.observe(time.perf_counter() - start)
+                status = response.status_code
+                if (status not in RETRY_STATUSES or attempt >= self.max_retries
+                        or not (idempotent or status == 429)):
+                    return response
+                delay = capped_delay(self.backoff_delay(attempt, response), deadline)
+                if delay is None:
+                    return response
+                response.close()
+            
+            print(f"🔁 {endpoint}: retrying in {delay:.2f}s "
+                  f"({response.status_code if response is not None else 'connection error'})")
+            with self.lock:
+                self.retries += 1
+            time.sleep(delay)
+            attempt += 1
+    
+    def get(self, endpoint, url, **kwargs):
+        return self.request(endpoint, 'GET', url, **kwargs)
+    
+    def post(self, endpoint, url, **kwargs):
+        return self.request(endpoint, 'POST', url, **kwargs)
+    
+    def latency_stats(self):
+        """Histogram snapshots per endpoint"""
+        with self.lock:
+            histograms = dict(self.histograms)
+        return {endpoint: histogram.snapshot() for endpoint, histogram in histograms.items()}
+    
+    def close(self):
+        self.session.close()
@@ -0,0 +1,92 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from .http_client import LatencyHistogram
+
+# Urgency of a game without a clock: after every timed game
+NO_CLOCK = float('inf')
+
+class SearchScheduler:
+    """
+    Runs the search jobs of all active games on a fixed pool of worker
+    threads, most urgent first. Urgency is the clock time per remaining
+    move, so a game in time trouble jumps the queue. Each job is called with
+    the seconds it spent waiting, so it can charge them to its clock.
+    """
+    
+    def __init__(self, workers=1, max_games=1):
+        self.max_games = max_games
+        self.queue = []
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+        self.running = 0
+        self.completed = 0
+        self.wait_latency = LatencyHistogram()
+        self.closed = False
+        self.threads = [threading.Thread(target=self._worker, name=f'search-{index}', daemon=True)
+                        for index in range(workers)]
+        for thread in self.threads:
+            thread.start()
+    
+    def submit(self, game_id, urgency, job):
+        """Queue job(waited_seconds) for a game; returns a Future with its result"""
+        future = Future()
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("scheduler is closed")
+            # Ties go to the earlier job
+            heapq.heappush(self.queue, (urgency, next(self.sequence), game_id, job, future, time.monotonic()))
+            self.condition.notify()
+        return future
+    
+    def _worker(self):
+        while True:
+            with self.condition:
+                while not self.queue and not self.closed:
+                    self.condition.wait()
+                if self.closed and not self.queue:
+                    return
+                _, _, game_id, job, future, queued = heapq.heappop(self.queue)
+                self.running += 1
+            
+            waited = time.monotonic() - queued
+            self.wait_latency.observe(waited)
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(job(waited))
+                except Exception as e:
+                    future.set_exception(e)
+            with self.condition:
+                self.running -= 1
+                self.completed += 1
+    
+    def has_capacity(self, active_games):
+        return active_games < self.max_games
+    
+    def stats(self):
+        with self.condition:
+            depth = len(self.queue)
+            running = self.running
+            completed = self.completed
+        return {
+            'queue_depth': depth,
+            'running': running,
+            'completed': completed,
+            'workers': len(self.threads),
+            'max_games': self.max_games,
+            'wait': self.wait_latency.snapshot(),
+        }
+    
+    def close(self):
+        """Finish the queued jobs, then stop the workers"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        for thread in self.threads:
+            thread.join()
+
+def clock_urgency(time_left, increment, moves_to_go):
+    """Seconds of clock per remaining move; lower is more urgent"""
+    return (time_left + increment * moves_to_go) / max(1, moves_to_go)
@@ -3,7 +3,9 @@ from tkinter import messagebox, filedialog
 import chess
 import chess.pgn
 import os
+import queue
 import sys
+import threading
 from datetime import datetime
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -11,12 +13,16 @@ parent_dir = os.path.dirname(os.path.dirname(current_dir))
 sys.path.append(parent_dir)
 
 from src.ai.bot import ChessBot
+from src.ai.search import MATE_BOUND
+
+# How often the Tk loop checks the search queue (ms)
+SEARCH_POLL_MS = 50
 
 class ChessGUI:
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("Chess Bot")
-        self.root.geometry("700x650")  # Slightly wider for save/load buttons
+        self.root.geometry("700x780")  # Room for the bot search controls
         self.captured_white = []
         self.captured_black = []
         self.board = chess.Board()
@@ -30,6 +36,14 @@ class ChessGUI:
         self.full_game_moves = []
         self.current_position = 0
         
+        # Background bot search: progress and the result come back through
+        # search_queue, tagged with search_id so stale searches are ignored
+        self.search_thread = None
+        self.search_stop = None
+        self.search_id = 0
+        self.search_queue = queue.Queue()
+        self.search_cancelled = False
+        
         self.light_color = "#F0D9B5"
         self.dark_color = "#B58863"
         self.highlight_color = "#FFFF00"
@@ -137,6 +151,29 @@ class ChessGUI:
         self.eval_label = tk.Label(eval_frame, text="Evaluation: 0.00", font=("Arial", 11), fg="blue")
         self.eval_label.pack(pady=(5, 0))
         
+        # Bot search settings and progress
+        search_frame = tk.Frame(right_frame)
+        search_frame.pack(fill=tk.X, pady=(20, 0))
+        tk.Label(search_frame, text="Bot Search", font=("Arial", 12, "bold")).pack()
+        
+        settings_frame = tk.Frame(search_frame)
+        settings_frame.pack(pady=(5, 0))
+        tk.Label(settings_frame, text="Depth", font=("Arial", 10)).pack(side=tk.LEFT)
+        self.depth_var = tk.StringVar(value=str(self.bot.search_depth))
+        tk.Spinbox(settings_frame, from_=1, to=30, width=4, textvariable=self.depth_var).pack(side=tk.LEFT, padx=(2, 10))
+        tk.Label(settings_frame, text="Time (s)", font=("Arial", 10)).pack(side=tk.LEFT)
+        # 0 = no time limit, search to the full depth
+        self.time_var = tk.StringVar(value="0")
+        tk.Spinbox(settings_frame, from_=0, to=600, increment=0.5, width=5, textvariable=self.time_var).pack(side=tk.LEFT, padx=2)
+        
+        self.progress_label = tk.Label(search_frame, text="", font=("Arial", 10), justify=tk.LEFT, wraplength=220)
+        self.progress_label.pack(pady=(5, 0))
+        
+        search_buttons = tk.Frame(search_frame)
+        search_buttons.pack(pady=(5, 0))
+        tk.Button(search_buttons, text="Move Now", command=self.move_now, width=10).pack(side=tk.LEFT, padx=2)
+        tk.Button(search_buttons, text="Cancel", command=self.cancel_search, width=10).pack(side=tk.LEFT, padx=2)
+        
         self.create_board()
         
         # Status label
@@ -342,22 +379,115 @@ class ChessGUI:
                 self.selected_square = None
                 self.update_board_display()
     
+    def search_settings(self):
+        """(depth, time limit in seconds or None) from the settings spinboxes"""
+        try:
+            depth = max(1, int(self.depth_var.get()))
+        except ValueError:
+            depth = self.bot.search_depth
+        try:
+            time_limit = float(self.time_var.get())
+        except ValueError:
+            time_limit = 0.0
+        return depth, time_limit if time_limit > 0 else None
+    
     def make_bot_move(self):
-        """Make the bot's move"""
-        if not self.board.is_game_over() and self.board.turn != self.human_color:
-            self.status_label.config(text="Bot is thinking...")
-            self.root.update()
-            
-            bot_move = self.bot.choose_move(self.board)
-            self.track_capture(bot_move)
-            self.board.push(bot_move)
-            self.full_game_moves.append(bot_move)
-            self.current_position = len(self.full_game_moves)
-            self.update_board_display()
-            self.update_captured_display()
-            
-            if self.board.is_game_over():
-                self.handle_game_over()
+        """Start the bot's search in a background thread; poll_search plays its move"""
+        if self.search_thread is not None or self.current_position < len(self.full_game_moves):
+            return
+        if self.board.is_game_over() or self.board.turn == self.human_color:
+            return
+        
+        depth, time_limit = self.search_settings()
+        self.search_id += 1
+        self.search_stop = threading.Event()
+        self.search_cancelled = False
+        self.status_label.config(text="Bot is thinking...")
+        self.progress_label.config(text="")
+        self.search_thread = threading.Thread(
+            target=self.run_search, name='gui-search', daemon=True,
+            args=(self.search_id, self.board.copy(), depth, time_limit, self.search_stop))
+        self.search_thread.start()
+        self.root.after(SEARCH_POLL_MS, self.poll_search, self.search_id)
+    
+    def run_search(self, search_id, board, depth, time_limit, stop_event):
+        """Search thread: never touches Tk, only posts to search_queue"""
+        def report(result):
+            pv = result.pv or [result.best_move]
+            self.search_queue.put(('progress', search_id, result.depth, pv[0], result.score))
+        
+        try:
+            move = self.bot.choose_move(board, time_limit=time_limit, depth=depth,
+                                        stop_event=stop_event, on_iteration=report)
+        except Exception as e:
+            self.search_queue.put(('error', search_id, str(e)))
+        else:
+            self.search_queue.put(('done', search_id, move))
+    
+    def poll_search(self, poll_id):
+        """Apply the search thread's messages; reschedules itself until it is done"""
+        if poll_id != self.search_id:
+            return  # The search was cancelled
+        while True:
+            try:
+                message = self.search_queue.get_nowait()
+            except queue.Empty:
+                break
+            kind, search_id = message[0], message[1]
+            if search_id != self.search_id:
+                continue  # From a search cancelled earlier
+            if kind == 'progress':
+                _, _, depth, move, score = message
+                self.show_search_progress(depth, move, score)
+            elif kind == 'error':
+                self.search_thread = None
+                self.status_label.config(text="Bot search failed")
+                messagebox.showerror("Bot Search", message[2])
+                return
+            else:
+                self.search_thread = None
+                if not self.search_cancelled and message[2] is not None:
+                    self.play_bot_move(message[2])
+                return
+        self.root.after(SEARCH_POLL_MS, self.poll_search, poll_id)
+    
+    def show_search_progress(self, depth, move, score):
+        if abs(score) >= MATE_BOUND:
+            eval_text = "mate for White" if score > 0 else "mate for Black"
+        else:
+            eval_text = f"{score/100:+.2f}"
+        self.progress_label.config(text=f"Depth {depth} | best {self.board.san(move)} | eval {eval_text}")
+    
+    def play_bot_move(self, bot_move):
+        self.track_capture(bot_move)
+        self.board.push(bot_move)
+        self.full_game_moves.append(bot_move)
+        self.current_position = len(self.full_game_moves)
+        self.update_board_display()
+        self.update_captured_display()
+        
+        if self.board.is_game_over():
+            self.handle_game_over()
+    
+    def move_now(self):
+        """Play the best move found so far, or start a search if none is running"""
+        if self.search_thread is None:
+            self.make_bot_move()
+        else:
+            self.search_stop.set()
+    
+    def cancel_search(self):
+        """Stop the bot's search without playing its move"""
+        if self.search_thread is None:
+            return
+        self.search_cancelled = True
+        self.search_stop.set()
+        # The search unwinds within a few ms; wait so the bot is free again.
+        # Its last messages no longer match search_id and are dropped.
+        self.search_thread.join()
+        self.search_thread = None
+        self.search_id += 1
+        self.status_label.config(text="Bot search cancelled (Move Now to restart)")
     
     def save_game(self):
         """Save current game to PGN file"""
@@ -395,6 +525,7 @@ class ChessGUI:
                     game = chess.pgn.read_game(f)
                 
                 if game:
+                    self.cancel_search()
                     self.board = chess.Board()
                     self.full_game_moves = []
                     self.current_position = 0
@@ -455,6 +586,7 @@ class ChessGUI:
         self.jump_to_position(target_moves)
 
     def jump_to_position(self, moves_to_play):
+        self.cancel_search()
         self.board = chess.Board()
         self.captured_white = []
         self.captured_black = []
@@ -467,6 +599,10 @@ class ChessGUI:
         self.legal_move_squares = []
         self.update_board_display()
         self.update_captured_display()
+        
+        # Back at the live position with the bot to move: let it think again
+        if self.current_position == len(self.full_game_moves):
+            self.root.after(500, self.make_bot_move)
     
     def handle_game_over(self):
         result = self.board.result()
@@ -479,6 +615,7 @@ class ChessGUI:
         messagebox.showinfo("Game Over", message)
     
     def new_game(self):
+        self.cancel_search()
         self.board = chess.Board()
         self.full_game_moves = []
         self.current_position = 0
@@ -486,6 +623,7 @@ class ChessGUI:
         self.legal_move_squares = []
         self.captured_white = []  
         self.captured_black = []
+        self.bot.new_game()
         self.update_board_display()
         self.update_captured_display()
         
@@ -0,0 +1,262 @@
+import sys
+import threading
+import chess
+from src.ai.bot import ChessBot
+from src.ai.search import MATE_BOUND, MATE_SCORE
+from src.ai.time_manager import position_volatility
+
+ENGINE_NAME = "SmartBot"
+ENGINE_AUTHOR = "SmartBot authors"
+
+# UCI options: name -> (type, default, min, max)
+OPTIONS = {
+    'Hash': ('spin', 16, 1, 4096),
+    'Threads': ('spin', 1, 1, 64),
+    'Ponder': ('check', False, None, None),
+    'SyzygyPath': ('string', '<empty>', None, None),
+}
+
+def uci_score(score, board):
+    """'cp N' or 'mate N' from the side to move's view, for a White-view search score"""
+    if board.turn == chess.BLACK:
+        score = -score
+    if abs(score) >= MATE_BOUND:
+        # Mate scores count plies from the start of the game, not from the root
+        plies = MATE_SCORE - abs(score) - board.ply()
+        moves = (plies + 1) // 2
+        return f'mate {moves if score > 0 else -moves}'
+    return f'cp {score}'
+
+class UCIEngine:
+    """
+    UCI front-end for ChessBot. Searches run in a background thread that the
+    input loop can stop at once through a threading.Event; progress is
+    streamed as info lines after every completed depth.
+    """
+    
+    def __init__(self, output=sys.stdout):
+        self.output = output
+        self.options = {name: spec[1] for name, spec in OPTIONS.items()}
+        self.bot = None
+        self.board = chess.Board()
+        self.thread = None
+        self.stop_event = threading.Event()
+        # Set when bestmove may be sent: at once, or after stop/ponderhit for
+        # go infinite and go ponder
+        self.release = threading.Event()
+        self.pondering = False
+        self.ponder_limits = None
+        self.write_lock = threading.Lock()
+    
+    def send(self, line):
+        with self.write_lock:
+            self.output.write(line + '\n')
+            self.output.flush()
+    
+    def engine(self):
+        """The ChessBot for the current options, created on first use"""
+        if self.bot is None:
+            syzygy = self.options['SyzygyPath']
+            self.bot = ChessBot(hash_mb=self.options['Hash'], workers=self.options['Threads'],
+                                syzygy_path=syzygy if syzygy not in ('', '<empty>') else None)
+        return self.bot
+    
+    def run(self, lines=sys.stdin):
+        for line in lines:
+            try:
+                if not self.handle(line.strip()):
+                    break
+            except ValueError as e:
+                # Bad FEN, illegal move or malformed number: report and carry on
+                self.send(f'info string error: {e}')
+        self.quit()
+    
+    def handle(self, line):
+        """Handle one command; returns False on quit"""
+        if not line:
+            return True
+        command, _, rest = line.partition(' ')
+        if command == 'uci':
+            self.send(f'id name {ENGINE_NAME}')
+            self.send(f'id author {ENGINE_AUTHOR}')
+            for name, (kind, default, low, high) in OPTIONS.items():
+                if kind == 'spin':
+                    self.send(f'option name {name} type spin default {default} min {low} max {high}')
+                elif kind == 'check':
+                    self.send(f'option name {name} type check default {str(default).lower()}')
+                else:
+                    self.send(f'option name {name} type string default {default}')
+            self.send('uciok')
+        elif command == 'isready':
+            self.engine()
+            self.send('readyok')
+        elif command == 'setoption':
+            self.set_option(rest)
+        elif command == 'ucinewgame':
+            self.stop()
+            self.engine().new_game()
+        elif command == 'position':
+            self.stop()
+            self.set_position(rest.split())
+        elif command == 'go':
+            self.stop()
+            self.go(rest.split())
+        elif command == 'stop':
+            self.stop()
+        elif command == 'ponderhit':
+            self.ponderhit()
+        elif command == 'quit':
+            return False
+        return True
+    
+    def set_option(self, text):
+        # setoption name <name> [value <value>]; names may contain spaces
+        words = text.split()
+        if 'name' not in words:
+            return
+        value_at = words.index('value') if 'value' in words else len(words)
+        name = ' '.join(words[words.index('name') + 1:value_at])
+        value = ' '.join(words[value_at + 1:])
+        spec = next(((key, item) for key, item in OPTIONS.items() if key.lower() == name.lower()), None)
+        if spec is None:
+            self.send(f'info string unknown option {name}')
+            return
+        key, (kind, _, low, high) = spec
+        if kind == 'spin':
+            self.options[key] = max(low, min(high, int(value)))
+        elif kind == 'check':
+            self.options[key] = value.lower() == 'true'
+        else:
+            self.options[key] = value
+        if key != 'Ponder' and self.bot is not None:
+            # Hash, threads and tablebases are fixed when the bot is built
+            self.stop()
+            self.bot.close()
+            self.bot = None
+    
+    def set_position(self, words):
+        if not words:
+            return
+        if words[0] == 'startpos':
+            board = chess.Board()
+            rest = words[1:]
+        elif words[0] == 'fen':
+            end = words.index('moves') if 'moves' in words else len(words)
+            board = chess.Board(' '.join(words[1:end]))
+            rest = words[end:]
+        else:
+            return
+        if rest and rest[0] == 'moves':
+            for uci in rest[1:]:
+                board.push_uci(uci)
+        self.board = board
+    
+    def go(self, words):
+        limits = {}
+        flags = {'infinite', 'ponder'}
+        index = 0
+        while index < len(words):
+            word = words[index]
+            if word in flags:
+                limits[word] = True
+                index += 1
+            elif word == 'searchmoves':
+                break
+            else:
+                if index + 1 < len(words):
+                    limits[word] = int(words[index + 1])
+                index += 2
+        
+        board = self.board.copy()
+        bot = self.engine()
+        time_limit = soft_limit = node_limit = depth = None
+        side = 'w' if board.turn == chess.WHITE else 'b'
+        if 'movetime' in limits:
+            time_limit = limits['movetime'] / 1000
+        elif f'{side}time' in limits:
+            time_left = limits[f'{side}time'] / 1000
+            increment = limits.get(f'{side}inc', 0) / 1000
+            budget = bot.time_manager.allocate(board, time_left, increment,
+                                               position_volatility(board, bot.last_search))
+            time_limit, soft_limit, depth = budget.hard, budget.soft, budget.max_depth
+        if 'nodes' in limits:
+            node_limit = limits['nodes']
+        if 'depth' in limits:
+            depth = limits['depth']
+        
+        self.pondering = limits.get('ponder', False)
+        infinite = limits.get('infinite', False) or self.pondering
+        if infinite:
+            # Budgets only start at ponderhit; until then search without limits
+            self.ponder_limits = (time_limit, soft_limit) if self.pondering else None
+            time_limit = soft_limit = None
+            if depth is None:
+                depth = 64
+        
+        self.stop_event = threading.Event()
+        self.release = threading.Event()
+        if not infinite:
+            self.release.set()
+        self.thread = threading.Thread(
+            target=self.search, name='uci-search', daemon=True,
+            args=(bot, board, time_limit, soft_limit, node_limit, depth, self.stop_event, self.release))
+        self.thread.start()
+    
+    def search(self, bot, board, time_limit, soft_limit, node_limit, depth, stop_event, release):
+        def report(result):
+            elapsed = max(result.elapsed, 1e-3)
+            pv = result.pv or ([result.best_move] if result.best_move else [])
+            self.send(f'info depth {result.depth} score {uci_score(result.score, board)} '
+                      f'nodes {result.nodes} nps {int(result.nodes / elapsed)} '
+                      f'time {int(result.elapsed * 1000)} pv {" ".join(move.uci() for move in pv)}')
+        
+        move = bot.choose_move(board, time_limit=time_limit, node_limit=node_limit, depth=depth,
+                               soft_limit=soft_limit, stop_event=stop_event, on_iteration=report)
+        # go infinite and go ponder must not answer before stop or ponderhit
+        release.wait()
+        if move is None:
+            self.send('bestmove 0000')
+            return
+        pv = bot.last_search.pv if bot.last_search is not None else []
+        if len(pv) >= 2 and pv[0] == move:
+            self.send(f'bestmove {move.uci()} ponder {pv[1].uci()}')
+        else:
+            self.send(f'bestmove {move.uci()}')
+    
+    def ponderhit(self):
+        """The predicted move was played: the ponder search now runs on our clock"""
+        if not self.pondering or self.thread is None:
+            return
+        self.pondering = False
+        time_limit, soft_limit = self.ponder_limits or (None, None)
+        self.release.set()
+        if time_limit is None:
+            return
+        stop_event = self.stop_event
+        # The search has no budget of its own; stop it from a timer after the
+        # soft limit's share of the clock (the time already spent is a bonus)
+        timer = threading.Timer(soft_limit if soft_limit is not None else time_limit, stop_event.set)
+        timer.daemon = True
+        timer.start()
+    
+    def stop(self):
+        """Stop any running search and wait for its bestmove"""
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.release.set()
+        self.thread.join()
+        self.thread = None
+        self.pondering = False
+    
+    def quit(self):
+        self.stop()
+        if self.bot is not None:
+            self.bot.close()
+            self.bot = None
+
+if __name__ == '__main__':
+    # Only protocol lines may reach stdout; anything else the bot prints goes to stderr
+    protocol_output = sys.stdout
+    sys.stdout = sys.stderr
+    UCIEngine(protocol_output).run()